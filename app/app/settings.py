@@ -10,9 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+from importlib.util import find_spec
 from pathlib import Path
 import os
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -38,6 +41,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'core',
     'rest_framework',
     'rest_framework.authtoken',
@@ -48,14 +52,22 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'core.metrics.MetricsMiddleware',
+    'core.profiling.ProfilingMiddleware',
+    'core.compression.CompressionMiddleware',
+    'core.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.CsrfViewMiddleware',
+    'core.middleware.AuthenticationMiddleware',
+    'core.middleware.MessageMiddleware',
+    'core.middleware.XFrameOptionsMiddleware',
 ]
 
+# API_ONLY skips the session, CSRF, auth, messages and clickjacking
+# middleware on /api/ routes, which authenticate with tokens, and drops
+# the browsable API. The admin keeps them, see core.middleware.
+API_ONLY = os.environ.get('API_ONLY') == 'true'
+
 ROOT_URLCONF = 'app.urls'
 
 TEMPLATES = [
@@ -85,7 +97,49 @@ DATABASES = {
         'HOST': os.environ.get('DB_HOST'),
         'NAME': os.environ.get('DB_NAME'),
         'USER': os.environ.get('DB_USER'),
-        'PASSWORD': os.environ.get('DB_PASS')
+        'PASSWORD': os.environ.get('DB_PASS'),
+        # Keep connections open between requests instead of paying the
+        # connect/auth handshake every time. Django advises against
+        # persistent connections under ASGI, so app/asgi.py defaults
+        # DB_CONN_MAX_AGE to 0; use the pool mode below there instead.
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': os.environ.get(
+            'DB_CONN_HEALTH_CHECKS', 'true'
+        ) == 'true',
+    }
+}
+
+# Connection pool mode, needs psycopg 3 with the pool extra
+# (`pip install "psycopg[pool]"`), which requirements.txt doesn't install.
+# Pooled connections replace persistent ones, so CONN_MAX_AGE must be 0.
+if os.environ.get('DB_POOL') == 'true':
+    if find_spec('psycopg') is None or find_spec('psycopg_pool') is None:
+        raise ImproperlyConfigured(
+            'DB_POOL needs psycopg 3 with the pool extra, run '
+            '`pip install "psycopg[pool]"`.'
+        )
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+            'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+            'max_idle': float(os.environ.get('DB_POOL_MAX_IDLE', 300)),
+        },
+    }
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Use a shared backend (e.g. redis) when running more than one worker so
+# cache invalidation reaches every process.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
     }
 }
 
@@ -109,6 +163,43 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# https://docs.djangoproject.com/en/5.2/topics/auth/passwords/
+# PASSWORD_HASHER picks the hasher for new passwords: scrypt, argon2
+# (needs argon2-cffi) or pbkdf2. Hashes made by the others still verify
+# and are rehashed on the next successful login, as are hashes made with
+# different cost parameters.
+
+PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'scrypt')
+
+_PASSWORD_HASHERS = {
+    'scrypt': 'core.hashers.ScryptPasswordHasher',
+    'argon2': 'core.hashers.Argon2PasswordHasher',
+    'pbkdf2': 'core.hashers.PBKDF2PasswordHasher',
+}
+
+if PASSWORD_HASHER not in _PASSWORD_HASHERS:
+    raise ImproperlyConfigured(
+        f'Unknown PASSWORD_HASHER {PASSWORD_HASHER!r}, choose one of: '
+        f"{', '.join(_PASSWORD_HASHERS)}."
+    )
+
+PASSWORD_HASHERS = [_PASSWORD_HASHERS[PASSWORD_HASHER]] + [
+    path for name, path in _PASSWORD_HASHERS.items()
+    if name != PASSWORD_HASHER
+]
+
+PASSWORD_HASHER_COST = {
+    'SCRYPT_WORK_FACTOR': int(os.environ.get('SCRYPT_WORK_FACTOR', 2**14)),
+    'SCRYPT_BLOCK_SIZE': int(os.environ.get('SCRYPT_BLOCK_SIZE', 8)),
+    'SCRYPT_PARALLELISM': int(os.environ.get('SCRYPT_PARALLELISM', 1)),
+    'ARGON2_TIME_COST': int(os.environ.get('ARGON2_TIME_COST', 2)),
+    'ARGON2_MEMORY_COST': int(os.environ.get('ARGON2_MEMORY_COST', 102400)),
+    'ARGON2_PARALLELISM': int(os.environ.get('ARGON2_PARALLELISM', 8)),
+    'PBKDF2_ITERATIONS': int(os.environ.get('PBKDF2_ITERATIONS', 1000000)),
+}
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -133,9 +224,144 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'core.User'
 
+# Passwords are checked in the login hashing pool, see LOGIN_HASH_POOL
+AUTHENTICATION_BACKENDS = ['user.backends.PooledModelBackend']
+
+# API_JSON picks the JSON renderer and parser of the APIs: DRF's stdlib
+# json ones or orjson (needs the orjson package), see core.renderers.
+API_JSON = os.environ.get('API_JSON', 'json')
+
+_JSON_CLASSES = {
+    'json': (
+        'rest_framework.renderers.JSONRenderer',
+        'rest_framework.parsers.JSONParser',
+    ),
+    'orjson': (
+        'core.renderers.ORJSONRenderer',
+        'core.renderers.ORJSONParser',
+    ),
+}
+
+if API_JSON not in _JSON_CLASSES:
+    raise ImproperlyConfigured(
+        f'Unknown API_JSON {API_JSON!r}, choose one of: '
+        f"{', '.join(_JSON_CLASSES)}."
+    )
+if API_JSON == 'orjson' and find_spec('orjson') is None:
+    raise ImproperlyConfigured(
+        'API_JSON=orjson needs the orjson package, run `pip install orjson`.'
+    )
+
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_RENDERER_CLASSES': [
+        _JSON_CLASSES[API_JSON][0],
+        *([] if API_ONLY else ['rest_framework.renderers.BrowsableAPIRenderer']),
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        _JSON_CLASSES[API_JSON][1],
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-}
\ No newline at end of file
+    'LIST_SERIALIZER_ERRORS_AS_DICT': True,
+    # Trusted reverse proxies in front of the app. With 0 throttles key on
+    # REMOTE_ADDR and X-Forwarded-For, which any client can send, is
+    # ignored.
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 0)),
+}
+
+# Recipe list pagination
+RECIPE_PAGE_SIZE = int(os.environ.get('RECIPE_PAGE_SIZE', 100))
+RECIPE_MAX_PAGE_SIZE = int(os.environ.get('RECIPE_MAX_PAGE_SIZE', 1000))
+
+# Per-user cache of rendered recipe list/detail responses. Writes only
+# invalidate it through the cache, so it's off by default with the
+# per-process LocMemCache: other workers would serve stale responses.
+RECIPE_RESPONSE_CACHE = {
+    'ENABLED': os.environ.get(
+        'RECIPE_RESPONSE_CACHE',
+        'false' if 'LocMemCache' in CACHES['default']['BACKEND'] else 'true',
+    ) == 'true',
+    'ALIAS': 'default',
+    'TIMEOUT': int(os.environ.get('RECIPE_RESPONSE_CACHE_TIMEOUT', 300)),
+}
+
+# Also match recipe titles by trigram similarity when searching. Needs the
+# pg_trgm extension.
+RECIPE_SEARCH_TRIGRAM = os.environ.get('RECIPE_SEARCH_TRIGRAM') == 'true'
+
+# Maximum number of recipes accepted by the bulk endpoint
+RECIPE_BULK_MAX_ITEMS = int(os.environ.get('RECIPE_BULK_MAX_ITEMS', 5000))
+
+# Token authentication cache. SHARED_CACHE names an entry in CACHES used
+# as a second tier shared between workers.
+# Deleting a token, or saving its user, evicts it in the worker that did
+# it and in the shared tier only. Other workers keep using their copy in
+# memory, e.g. of a deactivated user, for up to TTL seconds, or LOCAL_TTL
+# seconds with a shared tier, so keep them short.
+TOKEN_AUTH_CACHE = {
+    'MAX_SIZE': int(os.environ.get('TOKEN_AUTH_CACHE_SIZE', 10000)),
+    'TTL': int(os.environ.get('TOKEN_AUTH_CACHE_TTL', 10)),
+    'LOCAL_TTL': int(os.environ.get('TOKEN_AUTH_CACHE_LOCAL_TTL', 2)),
+    'SHARED_CACHE': os.environ.get('TOKEN_AUTH_SHARED_CACHE') or None,
+}
+
+# Token login: password hashing runs in a process pool of WORKERS
+# processes (0 hashes on the request thread) with at most MAX_PENDING
+# logins queued or running; extra logins get a 429.
+LOGIN_HASH_POOL = {
+    'WORKERS': int(os.environ.get('LOGIN_HASH_WORKERS', 2)),
+    'MAX_PENDING': int(os.environ.get('LOGIN_HASH_MAX_PENDING', 16)),
+    'TIMEOUT': float(os.environ.get('LOGIN_HASH_TIMEOUT', 5)),
+}
+
+# Failed token logins allowed per email and per ip within WINDOW seconds
+LOGIN_THROTTLE = {
+    'FAILURES': int(os.environ.get('LOGIN_THROTTLE_FAILURES', 5)),
+    'IP_FAILURES': int(os.environ.get('LOGIN_THROTTLE_IP_FAILURES', 50)),
+    'WINDOW': int(os.environ.get('LOGIN_THROTTLE_WINDOW', 300)),
+}
+
+# Sampled request profiling, see core.profiling. Histograms are served to
+# staff at /api/profiling/.
+REQUEST_PROFILING = {
+    'ENABLED': os.environ.get('REQUEST_PROFILING') == 'true',
+    'SAMPLE_RATE': float(os.environ.get('REQUEST_PROFILING_SAMPLE_RATE', 0.01)),
+    'SLOW_QUERY_MS': float(os.environ.get('REQUEST_PROFILING_SLOW_QUERY_MS', 100)),
+}
+
+# Prometheus metrics at /metrics, see core.metrics for running under a
+# pre-fork server. Off by default; with METRICS_TOKEN set scrapes must
+# send it as `Authorization: Bearer <token>`.
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED') == 'true'
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN') or None
+
+# The OpenAPI schema served at /api/schema/, written by
+# `manage.py build_schema`. Without it the schema is generated per request
+# in DEBUG, see core.schema. The image builds it, but docker-compose mounts
+# ./app over /app and hides that file in development, which only works
+# because DEBUG is on there; run build_schema in the container otherwise.
+API_SCHEMA_FILE = os.environ.get(
+    'API_SCHEMA_FILE', str(BASE_DIR / 'schema.json')
+)
+
+# gzip/brotli compression of API responses, see core.compression. Brotli
+# needs the brotli package.
+RESPONSE_COMPRESSION = {
+    'ENABLED': os.environ.get('RESPONSE_COMPRESSION', 'true') == 'true',
+    'MIN_SIZE': int(os.environ.get('RESPONSE_COMPRESSION_MIN_SIZE', 1024)),
+    'GZIP_LEVEL': int(os.environ.get('RESPONSE_COMPRESSION_GZIP_LEVEL', 6)),
+    'BROTLI_QUALITY': int(
+        os.environ.get('RESPONSE_COMPRESSION_BROTLI_QUALITY', 4)
+    ),
+    'CONTENT_TYPES': (
+        'application/json',
+        'application/x-ndjson',
+        'application/vnd.oai.openapi',
+        'application/vnd.oai.openapi+json',
+        'text/csv',
+    ),
+}
@@ -0,0 +1,161 @@
+"""
+Response compression for the APIs.
+
+Brotli is used when the `brotli` package is installed and the client
+accepts it, gzip otherwise.
+"""
+import zlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class GzipCompressor:
+    """Incremental gzip compressor."""
+    encoding = 'gzip'
+
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class BrotliCompressor:
+    """Incremental brotli compressor."""
+    encoding = 'br'
+
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+def accepted_encodings(header):
+    """Return the encodings of an Accept-Encoding header with q > 0."""
+    accepted = set()
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        quality = params.strip()
+        if quality.startswith('q='):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+def compress_stream(chunks, compressor):
+    """Compress chunks, flushing so each one is sent as it comes."""
+    for chunk in chunks:
+        if chunk:
+            yield compressor.compress(chunk) + compressor.flush()
+    yield compressor.finish()
+
+
+async def acompress_stream(chunks, compressor):
+    """Async counterpart of compress_stream."""
+    async for chunk in chunks:
+        if chunk:
+            yield compressor.compress(chunk) + compressor.flush()
+    yield compressor.finish()
+
+
+class CompressionMiddleware:
+    """Compress responses of RESPONSE_COMPRESSION['CONTENT_TYPES'].
+
+    Bodies under MIN_SIZE bytes aren't compressed; streamed bodies are
+    always compressed, chunk by chunk. Strong ETags become weak, as the
+    body no longer matches them byte for byte.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.config = settings.RESPONSE_COMPRESSION
+        if not self.config['ENABLED']:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.compress(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.compress(request, await self.get_response(request))
+
+    def get_compressor(self, request):
+        """Return a compressor for the client's accepted encodings."""
+        accepted = accepted_encodings(
+            request.headers.get('Accept-Encoding', '')
+        )
+        if brotli is not None and 'br' in accepted:
+            return BrotliCompressor(self.config['BROTLI_QUALITY'])
+        if 'gzip' in accepted:
+            return GzipCompressor(self.config['GZIP_LEVEL'])
+        return None
+
+    def compress(self, request, response):
+        content_type = response.get('Content-Type', '').split(';')[0]
+        if (content_type not in self.config['CONTENT_TYPES']
+                or response.has_header('Content-Encoding')
+                or request.method == 'HEAD'):
+            return response
+        if not response.streaming:
+            if len(response.content) < self.config['MIN_SIZE']:
+                return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        compressor = self.get_compressor(request)
+        if compressor is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = acompress_stream(
+                    response.streaming_content, compressor
+                )
+            else:
+                response.streaming_content = compress_stream(
+                    response.streaming_content, compressor
+                )
+            del response.headers['Content-Length']
+        else:
+            content = compressor.compress(response.content)
+            content += compressor.finish()
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response.headers['Content-Length'] = str(len(content))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = compressor.encoding
+        return response
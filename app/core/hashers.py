@@ -0,0 +1,26 @@
+"""
+Password hashers with cost parameters taken from settings.
+"""
+from django.conf import settings
+from django.contrib.auth import hashers
+
+COST = settings.PASSWORD_HASHER_COST
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    """Scrypt hasher, memory-hard and built on the standard library."""
+    work_factor = COST['SCRYPT_WORK_FACTOR']
+    block_size = COST['SCRYPT_BLOCK_SIZE']
+    parallelism = COST['SCRYPT_PARALLELISM']
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """Argon2 hasher, needs the argon2-cffi package."""
+    time_cost = COST['ARGON2_TIME_COST']
+    memory_cost = COST['ARGON2_MEMORY_COST']
+    parallelism = COST['ARGON2_PARALLELISM']
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """PBKDF2 hasher, kept to verify and upgrade older hashes."""
+    iterations = COST['PBKDF2_ITERATIONS']
@@ -0,0 +1,96 @@
+"""
+Django command to compare the async and sync recipe endpoints.
+"""
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import AsyncClient, Client
+from django.test.utils import setup_test_environment
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from core.models import Recipe
+
+
+class Command(BaseCommand):
+    """ Django command to benchmark the ASGI and WSGI request paths """
+    help = (
+        'Send concurrent list requests through the WSGI handler (sync '
+        'views, one thread per request) and the ASGI handler (async views) '
+        'and report throughput and latency.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes', type=int, default=100)
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, default=50)
+
+    def handle(self, *args, **options):
+        """EntryPoint for command"""
+        # The test clients send requests for the `testserver` host.
+        setup_test_environment()
+        user = get_user_model().objects.create_user(
+            email='async-benchmark@example.com'
+        )
+        try:
+            Recipe.objects.bulk_create([
+                Recipe(user=user, title=f'Recipe {i}', time_minutes=10,
+                       price=Decimal('1.00'))
+                for i in range(options['recipes'])
+            ])
+            headers = {
+                'Authorization': f'Token {Token.objects.create(user=user)}'
+            }
+            self.report('wsgi', *self.run_sync(
+                reverse('recipe:recipe-list'), headers, options
+            ))
+            self.report('asgi', *asyncio.run(self.run_async(
+                reverse('recipe:async-recipe-list'), headers, options
+            )))
+        finally:
+            user.delete()
+
+    def run_sync(self, url, headers, options):
+        """Send requests from a thread pool through the WSGI handler."""
+        def request(_):
+            start = time.perf_counter()
+            Client().get(url, headers=headers)
+            connections.close_all()
+            return (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(options['concurrency']) as pool:
+            timings = list(pool.map(request, range(options['requests'])))
+        return timings, time.perf_counter() - start
+
+    async def run_async(self, url, headers, options):
+        """Send concurrent requests through the ASGI handler."""
+        semaphore = asyncio.Semaphore(options['concurrency'])
+        client = AsyncClient()
+
+        async def request():
+            async with semaphore:
+                start = time.perf_counter()
+                await client.get(url, headers=headers)
+                return (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        timings = await asyncio.gather(
+            *(request() for _ in range(options['requests']))
+        )
+        return list(timings), time.perf_counter() - start
+
+    def report(self, name, timings, elapsed):
+        """Write throughput and latency percentiles."""
+        timings.sort()
+        p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+        self.stdout.write(
+            f'{name}: {len(timings) / elapsed:8.1f} req/s, '
+            f'p50 {statistics.median(timings):7.2f} ms, p99 {p99:7.2f} ms'
+        )
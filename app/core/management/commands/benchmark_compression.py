@@ -0,0 +1,102 @@
+"""
+Django command to compare compression settings on API responses.
+"""
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from core import compression
+from core.perf import benchmark_recipes
+from core.schema import generate_schema
+from recipe import exports
+from recipe.readers import plan_for
+from recipe.serializers import RecipeSerializer
+
+GZIP_LEVELS = (1, 6, 9)
+BROTLI_QUALITIES = (1, 4, 6, 11)
+
+
+def compressors():
+    """Return (name, factory) for each setting compared."""
+    found = [
+        (f'gzip-{level}', lambda level=level: (
+            compression.GzipCompressor(level)
+        ))
+        for level in GZIP_LEVELS
+    ]
+    if compression.brotli is not None:
+        found += [
+            (f'br-{quality}', lambda quality=quality: (
+                compression.BrotliCompressor(quality)
+            ))
+            for quality in BROTLI_QUALITIES
+        ]
+    return found
+
+
+class Command(BaseCommand):
+    """ Django command to benchmark response compression """
+    help = (
+        'Render a recipe list, a recipe export and the API schema, and '
+        'report the CPU time and bytes saved by each gzip level and '
+        'brotli quality.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        """EntryPoint for command"""
+        with transaction.atomic():
+            payloads = self.payloads(options['recipes'])
+            transaction.set_rollback(True)
+
+        for name, (chunks, streamed) in payloads.items():
+            size = sum(len(chunk) for chunk in chunks)
+            self.stdout.write(f'{name}: {size} bytes')
+            for setting, factory in compressors():
+                cpu = self.timed(
+                    lambda: self.compress(factory(), chunks, streamed),
+                    options['repeat'],
+                )
+                compressed = len(self.compress(factory(), chunks, streamed))
+                saved = 100 * (1 - compressed / size)
+                self.stdout.write(
+                    f'  {setting:>8}: {cpu:8.2f} ms CPU, '
+                    f'{compressed:9} bytes, {saved:5.1f}% saved'
+                )
+
+    def payloads(self, count):
+        """Return the response bodies compared as (chunks, streamed)."""
+        queryset = benchmark_recipes('compression@example.com', count)
+        plan = plan_for(RecipeSerializer)
+        return {
+            'recipe list': ([
+                JSONRenderer().render(
+                    plan.serialize(plan.queryset(queryset))
+                )
+            ], False),
+            'ndjson export': ([
+                chunk.encode() for chunk in exports.export_ndjson(queryset)
+            ], True),
+            'schema': ([JSONRenderer().render(generate_schema())], False),
+        }
+
+    def compress(self, compressor, chunks, streamed):
+        """Return chunks compressed the way the middleware does."""
+        if streamed:
+            return b''.join(compression.compress_stream(chunks, compressor))
+        return compressor.compress(chunks[0]) + compressor.finish()
+
+    def timed(self, func, repeat):
+        """Return the median CPU time in ms of repeat calls to func."""
+        timings = []
+        for _ in range(repeat):
+            start = time.process_time()
+            func()
+            timings.append((time.process_time() - start) * 1000)
+        return statistics.median(timings)
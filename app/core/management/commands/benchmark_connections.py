@@ -0,0 +1,89 @@
+"""
+Django command to measure database connection behaviour under load.
+"""
+import statistics
+import threading
+import time
+
+from django.core import signals
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+
+
+class Command(BaseCommand):
+    """ Django command to load test the database connection settings """
+    help = (
+        'Simulate concurrent requests against the database and report '
+        'the connection count and latency for the current settings. Run '
+        'it with and without DB_POOL / DB_CONN_MAX_AGE to compare.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=20)
+        parser.add_argument('--requests', type=int, default=100)
+
+    def handle(self, *args, **options):
+        """EntryPoint for command"""
+        settings_dict = connection.settings_dict
+        self.stdout.write(
+            f"CONN_MAX_AGE={settings_dict['CONN_MAX_AGE']} "
+            f"CONN_HEALTH_CHECKS={settings_dict['CONN_HEALTH_CHECKS']} "
+            f"pool={'pool' in settings_dict.get('OPTIONS', {})}"
+        )
+
+        timings = []
+        peak = [0]
+        lock = threading.Lock()
+        done = threading.Event()
+
+        def monitor():
+            while not done.is_set():
+                peak[0] = max(peak[0], self.connection_count())
+                done.wait(0.05)
+            connections.close_all()
+
+        def worker():
+            local = []
+            for _ in range(options['requests']):
+                start = time.perf_counter()
+                # Mirror the request cycle Django's handlers go through.
+                signals.request_started.send(sender=self.__class__)
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                signals.request_finished.send(sender=self.__class__)
+                local.append((time.perf_counter() - start) * 1000)
+            with lock:
+                timings.extend(local)
+            connections.close_all()
+
+        watcher = threading.Thread(target=monitor)
+        watcher.start()
+        threads = [
+            threading.Thread(target=worker)
+            for _ in range(options['threads'])
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        done.set()
+        watcher.join()
+
+        timings.sort()
+        p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+        self.stdout.write(
+            f'{len(timings)} requests in {elapsed:.2f}s, '
+            f'p50 {statistics.median(timings):.2f} ms, p99 {p99:.2f} ms, '
+            f'peak connections {peak[0]}'
+        )
+
+    def connection_count(self):
+        """Return the number of connections open to this database."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT count(*) FROM pg_stat_activity '
+                'WHERE datname = current_database()'
+            )
+            return cursor.fetchone()[0]
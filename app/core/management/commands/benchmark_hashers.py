@@ -0,0 +1,75 @@
+"""
+Django command to compare the configured password hashers.
+"""
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import get_hasher, get_hashers
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+from django.test.utils import setup_test_environment
+from django.urls import reverse
+
+PASSWORD = 'benchmark-password-123'
+
+
+class Command(BaseCommand):
+    """ Django command to benchmark verification cost per hasher """
+    help = (
+        'Report wall time and CPU time per password verification, and '
+        'token login latency, for each hasher in PASSWORD_HASHERS.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rounds', type=int, default=10)
+
+    def handle(self, *args, **options):
+        """EntryPoint for command"""
+        # The test client sends requests for the `testserver` host.
+        setup_test_environment()
+        for hasher in get_hashers():
+            try:
+                encoded = hasher.encode(PASSWORD, hasher.salt())
+            except ValueError as exc:
+                self.stdout.write(f'{hasher.algorithm:>14}: unavailable ({exc})')
+                continue
+
+            wall, cpu = [], []
+            for _ in range(options['rounds']):
+                start, start_cpu = time.perf_counter(), time.process_time()
+                hasher.verify(PASSWORD, encoded)
+                wall.append((time.perf_counter() - start) * 1000)
+                cpu.append((time.process_time() - start_cpu) * 1000)
+
+            login = self.login_latency(encoded, options['rounds'])
+            self.stdout.write(
+                f'{hasher.algorithm:>14}: verify {statistics.median(wall):8.1f} '
+                f'ms wall, {statistics.median(cpu):8.1f} ms cpu; '
+                f'login {statistics.median(login):8.1f} ms'
+                f'{"  (default)" if hasher is get_hasher() else ""}'
+            )
+
+    def login_latency(self, encoded, rounds):
+        """Return token login timings for a user with the given hash."""
+        client = Client()
+        timings = []
+        with transaction.atomic():
+            user = get_user_model().objects.create_user(
+                email='hasher-benchmark@example.com'
+            )
+            for _ in range(rounds):
+                # Reset the hash each round; logins with a non default
+                # hasher include the rehash to the default one.
+                get_user_model().objects.filter(pk=user.pk).update(
+                    password=encoded
+                )
+                start = time.perf_counter()
+                client.post(
+                    reverse('user:token'),
+                    {'email': user.email, 'password': PASSWORD},
+                )
+                timings.append((time.perf_counter() - start) * 1000)
+            transaction.set_rollback(True)
+        return timings
@@ -0,0 +1,77 @@
+"""
+Django command to compare the JSON renderers and parsers.
+"""
+import io
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.perf import benchmark_recipes
+from recipe.serializers import RecipeDetailSerializer
+
+
+def backends():
+    """Return the renderer and parser of each JSON backend installed."""
+    found = {'json': (JSONRenderer(), JSONParser())}
+    try:
+        from core.renderers import ORJSONParser, ORJSONRenderer
+    except ImportError:
+        pass
+    else:
+        found['orjson'] = (ORJSONRenderer(), ORJSONParser())
+    return found
+
+
+class Command(BaseCommand):
+    """ Django command to benchmark JSON rendering of recipes """
+    help = (
+        'Serialize recipes created inside a rolled back transaction and '
+        'time rendering and parsing them with each JSON backend.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        """EntryPoint for command"""
+        with transaction.atomic():
+            data = self.recipe_data(options['recipes'])
+            transaction.set_rollback(True)
+
+        outputs = {}
+        for name, (renderer, parser) in backends().items():
+            content = outputs[name] = renderer.render(data)
+            render = self.timed(
+                lambda: renderer.render(data), options['repeat']
+            )
+            parse = self.timed(
+                lambda: parser.parse(io.BytesIO(content)), options['repeat']
+            )
+            self.stdout.write(
+                f'{name:>7}: render {render:8.2f} ms, '
+                f'parse {parse:8.2f} ms, {len(content)} bytes'
+            )
+
+        identical = len(set(outputs.values())) == 1
+        self.stdout.write(f"Identical output: {'yes' if identical else 'no'}")
+
+    def recipe_data(self, count):
+        """Create count tagged recipes and return their API data."""
+        queryset = benchmark_recipes('json-benchmark@example.com', count)
+        return RecipeDetailSerializer(
+            queryset.prefetch_related('tags'), many=True
+        ).data
+
+    def timed(self, func, repeat):
+        """Return the median time in ms of repeat calls to func."""
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
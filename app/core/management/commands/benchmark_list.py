@@ -0,0 +1,75 @@
+"""
+Django command to compare compact and expanded recipe list pages.
+"""
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.perf import benchmark_recipes
+
+
+class Command(BaseCommand):
+    """ Django command to benchmark recipe list payloads """
+    help = (
+        'Request a page of recipes created inside a rolled back '
+        'transaction, compact and with expand=description, and report '
+        'the response size and time of each.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=10)
+
+    def handle(self, *args, **options):
+        """EntryPoint for command"""
+        variants = {
+            'compact': {},
+            'expanded': {'expand': 'description'},
+        }
+        results = {}
+        # Measure the view itself, not the response cache.
+        with transaction.atomic(), override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+            RECIPE_RESPONSE_CACHE={
+                **settings.RECIPE_RESPONSE_CACHE, 'ENABLED': False
+            },
+        ):
+            queryset = benchmark_recipes(
+                'list-benchmark@example.com', options['page_size']
+            )
+            client = APIClient()
+            client.force_authenticate(queryset.first().user)
+            for name, params in variants.items():
+                params = {**params, 'page_size': options['page_size']}
+                results[name] = self.measure(
+                    client, params, options['repeat']
+                )
+                size, elapsed = results[name]
+                self.stdout.write(
+                    f'{name:>8}: {size:9d} bytes, {elapsed:8.2f} ms'
+                )
+            transaction.set_rollback(True)
+
+        (compact, compact_ms), (expanded, expanded_ms) = results.values()
+        self.stdout.write(
+            f'Saved per page: {expanded - compact} bytes '
+            f'({1 - compact / expanded:.0%}), '
+            f'{expanded_ms - compact_ms:.2f} ms'
+        )
+
+    def measure(self, client, params, repeat):
+        """Return the response size and median time in ms of a page."""
+        url = reverse('recipe:recipe-list')
+        client.get(url, params)
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            response = client.get(url, params)
+            timings.append((time.perf_counter() - start) * 1000)
+        return len(response.content), statistics.median(timings)
@@ -0,0 +1,70 @@
+"""
+Django command to compare API throughput with and without API_ONLY.
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.perf import benchmark_recipes
+
+
+class Command(BaseCommand):
+    """ Django command to benchmark the middleware stack of the APIs """
+    help = (
+        'Request API endpoints in this process, with the full middleware '
+        'stack and with API_ONLY, and report the requests per second of '
+        'each. Data is created inside a rolled back transaction.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=2)
+
+    def handle(self, *args, **options):
+        """EntryPoint for command"""
+        with transaction.atomic(), override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+        ):
+            recipe = benchmark_recipes('middleware@example.com', 10).first()
+            token = Token.objects.create(user=recipe.user)
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+            urls = {
+                'recipe detail': reverse(
+                    'recipe:recipe-detail', args=[recipe.id]
+                ),
+                'tag list': reverse('recipe:tag-list'),
+                'user': reverse('user:me'),
+            }
+            for name, url in urls.items():
+                rates = [
+                    self.measure(client, url, api_only, options['seconds'])
+                    for api_only in (False, True)
+                ]
+                self.stdout.write(
+                    f'{name:>13}: full {rates[0]:8.1f} req/s, '
+                    f'API_ONLY {rates[1]:8.1f} req/s '
+                    f'({rates[1] / rates[0] - 1:+.0%})'
+                )
+            transaction.set_rollback(True)
+
+    def measure(self, client, url, api_only, seconds):
+        """Return the requests per second to url over seconds."""
+        with override_settings(API_ONLY=api_only):
+            client.get(url)
+            count = 0
+            start = time.perf_counter()
+            deadline = start + seconds
+            while time.perf_counter() < deadline:
+                response = client.get(url)
+                if response.status_code != 200:
+                    raise CommandError(
+                        f'{url} returned {response.status_code}.'
+                    )
+                count += 1
+            return count / (time.perf_counter() - start)
@@ -0,0 +1,112 @@
+"""
+Django command to compare recipe search strategies.
+"""
+import random
+import statistics
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from core.models import Recipe
+from recipe.search import search_recipes
+
+INGREDIENTS = [
+    'apple', 'basil', 'bean', 'beef', 'broccoli', 'cabbage', 'carrot',
+    'cheese', 'chicken', 'chickpea', 'chili', 'coconut', 'corn', 'curry',
+    'egg', 'garlic', 'ginger', 'honey', 'lamb', 'lemon', 'lentil',
+    'mango', 'mushroom', 'noodle', 'onion', 'pasta', 'peanut', 'pepper',
+    'pork', 'potato', 'prawn', 'pumpkin', 'rice', 'salmon', 'spinach',
+    'tofu', 'tomato', 'tuna', 'walnut', 'yogurt',
+]
+DISHES = [
+    'bake', 'bowl', 'burger', 'casserole', 'pie', 'risotto', 'salad',
+    'sandwich', 'soup', 'stew', 'stir fry', 'tacos', 'tart', 'wrap',
+]
+
+# Made up words so search terms are selective, like real user queries.
+SYLLABLES = ['ba', 'ko', 'ri', 'mu', 'te', 'sa', 'lo', 'ni', 'pe', 'zu']
+WORDS = [a + b + c for a in SYLLABLES for b in SYLLABLES for c in SYLLABLES]
+
+
+class Command(BaseCommand):
+    """ Django command to benchmark full-text search against icontains """
+    help = (
+        'Generate recipes inside a rolled back transaction and compare '
+        'full-text search latency with icontains.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000000)
+        parser.add_argument('--queries', type=int, default=20)
+        parser.add_argument('--batch-size', type=int, default=10000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        """EntryPoint for command"""
+        rng = random.Random(options['seed'])
+        with transaction.atomic():
+            user = get_user_model().objects.create_user(
+                email='search-benchmark@example.com'
+            )
+            self.generate(user, options['rows'], options['batch_size'], rng)
+
+            terms = rng.sample(WORDS, options['queries'])
+            base = Recipe.objects.filter(user=user)
+            strategies = {
+                'icontains': lambda term: base.filter(
+                    Q(title__icontains=term) | Q(description__icontains=term)
+                ).order_by('-id'),
+                'full-text': lambda term: search_recipes(base, term),
+            }
+            for name, build in strategies.items():
+                self.report(name, [
+                    self.timed(build(term)[:20]) for term in terms
+                ])
+
+            transaction.set_rollback(True)
+
+    def generate(self, user, rows, batch_size, rng):
+        """Insert rows synthetic recipes for user."""
+        start = time.perf_counter()
+        for offset in range(0, rows, batch_size):
+            Recipe.objects.bulk_create([
+                Recipe(
+                    user=user,
+                    title=self.title(rng),
+                    description=' '.join(
+                        [self.title(rng)] + rng.sample(WORDS, 5)
+                    ),
+                    time_minutes=rng.randint(5, 180),
+                    price=Decimal(rng.randint(100, 5000)) / 100,
+                )
+                for _ in range(min(batch_size, rows - offset))
+            ])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE core_recipe')
+        self.stdout.write(
+            f'Generated {rows} recipes in {time.perf_counter() - start:.1f}s'
+        )
+
+    def title(self, rng):
+        """Return a random recipe title."""
+        return f'{rng.choice(INGREDIENTS)} {rng.choice(INGREDIENTS)} ' \
+               f'{rng.choice(DISHES)}'
+
+    def timed(self, queryset):
+        """Return the time in ms to fetch the queryset."""
+        start = time.perf_counter()
+        list(queryset)
+        return (time.perf_counter() - start) * 1000
+
+    def report(self, name, timings):
+        """Write latency percentiles for a strategy."""
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(
+            f'{name:>10}: median {statistics.median(timings):8.2f} ms, '
+            f'p95 {p95:8.2f} ms, max {timings[-1]:8.2f} ms'
+        )
@@ -0,0 +1,66 @@
+"""
+Django command to compare the recipe serializer with its read plan.
+"""
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Prefetch
+from rest_framework.renderers import JSONRenderer
+
+from core.models import Tag
+from core.perf import benchmark_recipes
+from recipe.readers import plan_for
+from recipe.serializers import RecipeDetailSerializer
+
+
+class Command(BaseCommand):
+    """ Django command to benchmark serializing recipe lists """
+    help = (
+        'Serialize recipes created inside a rolled back transaction with '
+        'RecipeDetailSerializer and with its ReadPlan, queries included.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipes', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        """EntryPoint for command"""
+        with transaction.atomic():
+            queryset = benchmark_recipes(
+                'serializer-benchmark@example.com', options['recipes']
+            )
+            plan = plan_for(RecipeDetailSerializer)
+            paths = {
+                'serializer': lambda: RecipeDetailSerializer(
+                    queryset.prefetch_related(Prefetch(
+                        'tags', queryset=Tag.objects.order_by('id')
+                    )),
+                    many=True,
+                ).data,
+                'read plan': lambda: plan.serialize(plan.queryset(queryset)),
+            }
+            timings = {}
+            outputs = set()
+            for name, serialize in paths.items():
+                timings[name] = self.timed(serialize, options['repeat'])
+                outputs.add(JSONRenderer().render(serialize()))
+                self.stdout.write(f'{name:>10}: {timings[name]:8.2f} ms')
+            transaction.set_rollback(True)
+
+        speedup = timings['serializer'] / timings['read plan']
+        self.stdout.write(
+            f"Speedup: {speedup:.1f}x, identical output: "
+            f"{'yes' if len(outputs) == 1 else 'no'}"
+        )
+
+    def timed(self, func, repeat):
+        """Return the median time in ms of repeat calls to func."""
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
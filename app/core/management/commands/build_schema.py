@@ -0,0 +1,25 @@
+"""
+Django command to build the OpenAPI schema served by the API.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.schema import write_schema
+
+
+class Command(BaseCommand):
+    """ Django command to precompute the OpenAPI schema """
+    help = (
+        'Generate the OpenAPI schema and write it to API_SCHEMA_FILE, to '
+        'run at build or deploy time.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', default=settings.API_SCHEMA_FILE)
+
+    def handle(self, *args, **options):
+        """EntryPoint for command"""
+        content = write_schema(options['file'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Schema written to {options['file']} ({len(content)} bytes)"
+        ))
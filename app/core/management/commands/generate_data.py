@@ -0,0 +1,140 @@
+"""
+Django command to generate synthetic users, recipes and tags.
+"""
+import random
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.models import Recipe, Tag
+
+WORDS = (
+    'spicy chicken beef tofu garlic lemon curry pasta salad soup roasted '
+    'grilled smoked baked honey ginger tomato mushroom rice noodle bean '
+    'pork lamb salmon prawn chilli basil coconut cheese potato pie'
+).split()
+TAG_NAMES = (
+    'vegan vegetarian dessert breakfast lunch dinner quick budget '
+    'healthy spicy baking gluten-free dairy-free comfort party'
+).split()
+
+
+def skewed_weights(count, skew):
+    """Return Zipf-style weights, so low indexes are picked more often."""
+    return [1 / (rank ** skew) for rank in range(1, count + 1)]
+
+
+class Command(BaseCommand):
+    """ Django command to fill the database with synthetic data """
+    help = (
+        'Generate users, tags and recipes with bulk_create. --skew spreads '
+        'recipes and tags over users and tags Zipf-style (0 is uniform).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--recipes', type=int, default=10000)
+        parser.add_argument('--tags', type=int, default=10, help='per user')
+        parser.add_argument(
+            '--tags-per-recipe', type=int, default=3, help='maximum'
+        )
+        parser.add_argument('--skew', type=float, default=1.0)
+        parser.add_argument('--prefix', default='load')
+        parser.add_argument('--password', default='loadtest123')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int)
+
+    def handle(self, *args, **options):
+        """EntryPoint for command"""
+        rng = random.Random(options['seed'])
+        batch_size = options['batch_size']
+        prefix = options['prefix']
+        User = get_user_model()
+        if User.objects.filter(email__startswith=f'{prefix}-').exists():
+            raise CommandError(
+                f'Users named {prefix}-*@example.com already exist; '
+                'pass another --prefix.'
+            )
+
+        with transaction.atomic():
+            # Hashing is the slow part of creating a user, and every
+            # generated user shares a password, so hash it once.
+            password = make_password(options['password'])
+            users = User.objects.bulk_create(
+                (
+                    User(
+                        email=f'{prefix}-{number}@example.com',
+                        name=f'Load user {number}',
+                        password=password,
+                    )
+                    for number in range(options['users'])
+                ),
+                batch_size=batch_size,
+            )
+            tags = Tag.objects.bulk_create(
+                (
+                    Tag(user=user, name=self.tag_name(number))
+                    for user in users
+                    for number in range(options['tags'])
+                ),
+                batch_size=batch_size,
+            )
+            user_tags = {}
+            for tag in tags:
+                user_tags.setdefault(tag.user_id, []).append(tag)
+            self.stdout.write(f'{len(users)} users, {len(tags)} tags...')
+
+            user_weights = skewed_weights(len(users), options['skew'])
+            tag_weights = skewed_weights(options['tags'], options['skew'])
+            created = 0
+            while created < options['recipes']:
+                size = min(batch_size, options['recipes'] - created)
+                owners = rng.choices(users, user_weights, k=size)
+                recipes = Recipe.objects.bulk_create(
+                    self.recipe(rng, owner) for owner in owners
+                )
+                Recipe.tags.through.objects.bulk_create(
+                    self.recipe_tags(
+                        rng, recipes, user_tags, tag_weights,
+                        options['tags_per_recipe'],
+                    ),
+                    ignore_conflicts=True,
+                )
+                created += size
+                self.stdout.write(f'{created} recipes...')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {len(users)} users, {len(tags)} tags and '
+            f'{created} recipes.'
+        ))
+
+    def tag_name(self, number):
+        """Return a tag name, numbering them once the word list runs out."""
+        name = TAG_NAMES[number % len(TAG_NAMES)]
+        if number >= len(TAG_NAMES):
+            name = f'{name}-{number // len(TAG_NAMES)}'
+        return name
+
+    def recipe(self, rng, owner):
+        """Return an unsaved recipe with random content for owner."""
+        title = ' '.join(rng.sample(WORDS, rng.randint(2, 4))).capitalize()
+        return Recipe(
+            user=owner,
+            title=title,
+            description=' '.join(rng.choices(WORDS, k=rng.randint(0, 40))),
+            time_minutes=rng.randint(5, 180),
+            price=Decimal(rng.randint(100, 9999)) / 100,
+            link=f'https://example.com/{rng.getrandbits(32):08x}',
+        )
+
+    def recipe_tags(self, rng, recipes, user_tags, weights, maximum):
+        """Yield through rows tagging each recipe with its owner's tags."""
+        for recipe in recipes:
+            tags = user_tags.get(recipe.user_id)
+            if not tags:
+                continue
+            for tag in rng.choices(tags, weights, k=rng.randint(0, maximum)):
+                yield Recipe.tags.through(recipe_id=recipe.id, tag_id=tag.id)
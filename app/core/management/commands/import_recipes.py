@@ -0,0 +1,60 @@
+"""
+Django command to import recipes from an NDJSON or CSV file.
+"""
+import os
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from recipe import imports
+
+
+class Command(BaseCommand):
+    """ Django command to stream recipes into the database """
+    help = 'Import recipes for a user from an NDJSON or CSV file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--user', required=True, help='owner email')
+        parser.add_argument('--type', choices=sorted(imports.READERS))
+        parser.add_argument(
+            '--batch-size', type=int, default=imports.BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        """EntryPoint for command"""
+        try:
+            user = get_user_model().objects.get(email=options['user'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"User {options['user']} does not exist.")
+
+        import_type = options['type']
+        if import_type is None:
+            import_type = os.path.splitext(options['path'])[1].lstrip('.')
+            if import_type not in imports.READERS:
+                raise CommandError('Pass --type for this file.')
+
+        created = failed = 0
+        with open(options['path'], 'rb') as upload:
+            rows = imports.read_upload(upload, import_type)
+            batches = imports.import_recipes(
+                user, rows, batch_size=options['batch_size']
+            )
+            try:
+                for batch_created, errors in batches:
+                    created += batch_created
+                    failed += len(errors)
+                    for number, detail in errors:
+                        self.stderr.write(f'line {number}: {detail}')
+                    self.stdout.write(
+                        f'{created} recipes imported, {failed} rows skipped...'
+                    )
+            except UnicodeDecodeError as exc:
+                raise CommandError(
+                    f'{options["path"]} is not UTF-8 encoded ({exc}), '
+                    f'{created} recipes were imported before the error.'
+                )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {created} recipes, skipped {failed} rows.'
+        ))
@@ -0,0 +1,194 @@
+"""
+Django command to drive load against a running API server.
+"""
+import json
+import random
+import statistics
+import threading
+import time
+import urllib.request
+
+from django.core.management.base import BaseCommand, CommandError
+
+ENDPOINTS = ('token', 'list', 'detail', 'create', 'update')
+MIX = 'token=5,list=40,detail=35,create=10,update=10'
+
+
+def percentile(timings, fraction):
+    """Return the timing at fraction of the sorted timings."""
+    return timings[min(len(timings) - 1, int(len(timings) * fraction))]
+
+
+class Client:
+    """Minimal JSON client for one simulated API user."""
+
+    def __init__(self, url, email, password):
+        self.url = url.rstrip('/')
+        self.email = email
+        self.password = password
+        self.key = None
+        self.ids = []
+
+    def call(self, method, path, data=None):
+        """Send a request and return the decoded JSON response."""
+        headers = {'Content-Type': 'application/json'}
+        if self.key:
+            headers['Authorization'] = f'Token {self.key}'
+        body = None if data is None else json.dumps(data).encode()
+        request = urllib.request.Request(
+            self.url + path, data=body, headers=headers, method=method
+        )
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return json.loads(response.read() or 'null')
+
+    def token(self, rng, page_size):
+        """Log in and keep the token for later requests."""
+        self.key = None
+        self.key = self.call('POST', '/api/user/token/', {
+            'email': self.email, 'password': self.password,
+        })['token']
+
+    def list(self, rng, page_size):
+        """List recipes and remember their ids."""
+        query = f'?page_size={page_size}' if page_size else ''
+        data = self.call('GET', f'/api/recipe/recipes/{query}')
+        if isinstance(data, dict):
+            data = data['results']
+        self.ids = [recipe['id'] for recipe in data] or self.ids
+
+    def detail(self, rng, page_size):
+        """Fetch a known recipe."""
+        if not self.ids:
+            return self.list(rng, page_size)
+        self.call('GET', f'/api/recipe/recipes/{rng.choice(self.ids)}/')
+
+    def create(self, rng, page_size):
+        """Create a tagged recipe."""
+        recipe = self.call('POST', '/api/recipe/recipes/', {
+            'title': f'Load test recipe {rng.getrandbits(32):08x}',
+            'time_minutes': rng.randint(5, 120),
+            'price': f'{rng.randint(100, 9999) / 100:.2f}',
+            'tags': [{'name': rng.choice(['quick', 'dinner', 'load'])}],
+        })
+        self.ids.append(recipe['id'])
+
+    def update(self, rng, page_size):
+        """Patch a known recipe."""
+        if not self.ids:
+            return self.create(rng, page_size)
+        self.call('PATCH', f'/api/recipe/recipes/{rng.choice(self.ids)}/', {
+            'time_minutes': rng.randint(5, 120),
+        })
+
+
+class Command(BaseCommand):
+    """ Django command to load test a running server """
+    help = (
+        'Hit the token, list, detail, create and update endpoints of a '
+        'running server at a fixed concurrency, logging in as users made '
+        'by generate_data, and report throughput and latency percentiles.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://localhost:8000')
+        parser.add_argument('--concurrency', type=int, default=10)
+        parser.add_argument('--duration', type=float, default=30)
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--prefix', default='load')
+        parser.add_argument('--password', default='loadtest123')
+        parser.add_argument(
+            '--page-size', type=int, default=100,
+            help='list page size; 0 requests the unpaginated list',
+        )
+        parser.add_argument('--mix', default=MIX, help='endpoint=weight,...')
+        parser.add_argument('--seed', type=int)
+
+    def handle(self, *args, **options):
+        """EntryPoint for command"""
+        try:
+            mix = {
+                name: int(weight) for name, weight in
+                (item.split('=') for item in options['mix'].split(','))
+            }
+        except ValueError:
+            raise CommandError('--mix must look like list=50,detail=50.')
+        unknown = set(mix) - set(ENDPOINTS)
+        if unknown:
+            raise CommandError(f"Unknown endpoints: {', '.join(unknown)}.")
+
+        timings = {name: [] for name in ENDPOINTS}
+        errors = dict.fromkeys(ENDPOINTS, 0)
+        lock = threading.Lock()
+        deadline = time.perf_counter() + options['duration']
+        seed = random.Random(options['seed'])
+
+        def worker(number, rng):
+            client = Client(
+                options['url'],
+                f"{options['prefix']}-{number % options['users']}"
+                '@example.com',
+                options['password'],
+            )
+            local = {name: [] for name in ENDPOINTS}
+            failed = dict.fromkeys(ENDPOINTS, 0)
+            names, weights = list(mix), list(mix.values())
+            while time.perf_counter() < deadline:
+                name = 'token' if client.key is None else (
+                    rng.choices(names, weights)[0]
+                )
+                method = getattr(client, name)
+                start = time.perf_counter()
+                try:
+                    method(rng, options['page_size'])
+                except (OSError, KeyError):
+                    failed[name] += 1
+                    continue
+                local[name].append(
+                    (time.perf_counter() - start) * 1000
+                )
+            with lock:
+                for name, values in local.items():
+                    timings[name].extend(values)
+                for name, count in failed.items():
+                    errors[name] += count
+
+        threads = [
+            threading.Thread(
+                target=worker, args=(number, random.Random(seed.random()))
+            )
+            for number in range(options['concurrency'])
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(
+            f"{'endpoint':<10}{'requests':>10}{'errors':>8}{'rps':>9}"
+            f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+        )
+        everything = []
+        for name in ENDPOINTS:
+            if not timings[name] and not errors[name]:
+                continue
+            values = sorted(timings[name])
+            everything.extend(values)
+            self.write_row(name, values, errors[name], elapsed)
+        self.write_row(
+            'total', sorted(everything), sum(errors.values()), elapsed
+        )
+
+    def write_row(self, name, values, failed, elapsed):
+        """Write one line of the latency table."""
+        if not values:
+            self.stdout.write(f'{name:<10}{0:>10}{failed:>8}')
+            return
+        self.stdout.write(
+            f'{name:<10}{len(values):>10}{failed:>8}'
+            f'{len(values) / elapsed:>9.1f}'
+            f'{statistics.median(values):>9.1f}'
+            f'{percentile(values, 0.95):>9.1f}'
+            f'{percentile(values, 0.99):>9.1f}'
+        )
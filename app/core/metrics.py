@@ -0,0 +1,247 @@
+"""
+Prometheus metrics for the APIs.
+
+Under a pre-fork server set PROMETHEUS_MULTIPROC_DIR to an empty
+directory shared by the workers (and wiped on restart) before starting
+it: each worker then writes its samples to memory mapped files there and
+/metrics aggregates them. Servers that reap workers should call
+`prometheus_client.multiprocess.mark_process_dead(pid)` so live gauges
+drop dead workers.
+"""
+import hmac
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+from user.authentication import token_cache
+
+REQUESTS = Counter(
+    'django_http_requests_total',
+    'Requests by route, method and status.',
+    ['route', 'method', 'status'],
+)
+LATENCY = Histogram(
+    'django_http_request_duration_seconds',
+    'Request latency by route and method.',
+    ['route', 'method'],
+    buckets=(.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10),
+)
+QUERIES = Histogram(
+    'django_http_request_db_queries',
+    'Database queries per request by route and method.',
+    ['route', 'method'],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 500),
+)
+POOL = Gauge(
+    'django_db_pool_connections',
+    'Connections of the database connection pools by state.',
+    ['alias', 'state'],
+    multiprocess_mode='livesum',
+)
+TOKEN_CACHE = Counter(
+    'auth_token_cache_lookups_total',
+    'Token authentication cache lookups by result.',
+    ['result'],
+)
+
+METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+SYNC_INTERVAL = 1.0
+
+_queries = ContextVar('queries', default=None)
+_synced = 0.0
+
+
+def count_query(execute, sql, params, many, context):
+    """Database execute wrapper counting the queries of a request."""
+    counter = _queries.get()
+    if counter is not None:
+        counter[0] += 1
+    return execute(sql, params, many, context)
+
+
+def install_query_counter(sender=None, connection=None, **kwargs):
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
+
+
+class TokenCacheSync:
+    """Copy the token cache counters of this process into TOKEN_CACHE."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seen = {'hit': 0, 'shared_hit': 0, 'miss': 0}
+
+    def __call__(self):
+        stats = token_cache.stats()
+        current = {
+            'hit': stats['hits'],
+            'shared_hit': stats['shared_hits'],
+            'miss': stats['misses'],
+        }
+        with self._lock:
+            deltas = {
+                result: value - self._seen[result]
+                for result, value in current.items()
+            }
+            self._seen = current
+        for result, delta in deltas.items():
+            # A negative delta means the cache was cleared.
+            if delta > 0:
+                TOKEN_CACHE.labels(result).inc(delta)
+
+
+sync_token_cache = TokenCacheSync()
+
+
+def update_pool_gauges():
+    """Set the pool gauges from the connection pools of this process."""
+    for alias in connections:
+        # Only read pools already opened; the `pool` property would open
+        # one, which isn't allowed from async code. The opened pools are
+        # kept in the private `DatabaseWrapper._connection_pools` of the
+        # postgresql backend since Django 5.1 (checked up to 5.2), so
+        # anything else reports no pool.
+        pools = getattr(type(connections[alias]), '_connection_pools', None)
+        if not isinstance(pools, dict):
+            continue
+        pool = pools.get(alias)
+        if pool is None:
+            continue
+        stats = pool.get_stats()
+        size = stats.get('pool_size', 0)
+        available = stats.get('pool_available', 0)
+        POOL.labels(alias, 'size').set(size)
+        POOL.labels(alias, 'in_use').set(size - available)
+        POOL.labels(alias, 'waiting').set(stats.get('requests_waiting', 0))
+
+
+def update_process_metrics(force=False):
+    """Refresh the gauges and cache counters of this process.
+
+    Runs after requests at most every SYNC_INTERVAL seconds, so every
+    worker keeps its samples current without taking the token cache and
+    pool locks on each request.
+    """
+    global _synced
+    now = time.monotonic()
+    if not force and now - _synced < SYNC_INTERVAL:
+        return
+    _synced = now
+    sync_token_cache()
+    update_pool_gauges()
+
+
+class TokenCacheRatioCollector:
+    """Token cache hit ratio, computed from the aggregated counters."""
+
+    def __init__(self, registry):
+        self.registry = registry
+
+    def collect(self):
+        lookups = {
+            result: self.registry.get_sample_value(
+                'auth_token_cache_lookups_total', {'result': result}
+            ) or 0
+            for result in ('hit', 'shared_hit', 'miss')
+        }
+        total = sum(lookups.values())
+        hits = lookups['hit'] + lookups['shared_hit']
+        yield GaugeMetricFamily(
+            'auth_token_cache_hit_ratio',
+            'Share of token cache lookups that were hits.',
+            value=hits / total if total else 0.0,
+        )
+
+
+def collect_metrics():
+    """Return the metrics of every process in the exposition format."""
+    registry = REGISTRY
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    ratio = CollectorRegistry()
+    ratio.register(TokenCacheRatioCollector(registry))
+    return generate_latest(registry) + generate_latest(ratio)
+
+
+def metrics_view(request):
+    """Serve the metrics to Prometheus, to holders of METRICS_TOKEN when
+    it is set."""
+    if not settings.METRICS_ENABLED:
+        raise Http404()
+    if settings.METRICS_TOKEN is not None:
+        expected = f'Bearer {settings.METRICS_TOKEN}'
+        given = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(given.encode(), expected.encode()):
+            return HttpResponseForbidden()
+    update_process_metrics(force=True)
+    return HttpResponse(collect_metrics(), content_type=CONTENT_TYPE_LATEST)
+
+
+class MetricsMiddleware:
+    """Count requests and record their latency and queries by route."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        connection_created.connect(install_query_counter)
+        for connection in connections.all(initialized_only=True):
+            install_query_counter(connection=connection)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        start = time.perf_counter()
+        counter = [0]
+        token = _queries.set(counter)
+        try:
+            response = self.get_response(request)
+        finally:
+            _queries.reset(token)
+        self.observe(request, response, start, counter[0])
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        counter = [0]
+        token = _queries.set(counter)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _queries.reset(token)
+        self.observe(request, response, start, counter[0])
+        return response
+
+    def observe(self, request, response, start, queries):
+        match = request.resolver_match
+        route = match.view_name if match else '<unresolved>'
+        method = request.method if request.method in METHODS else 'other'
+        LATENCY.labels(route, method).observe(time.perf_counter() - start)
+        QUERIES.labels(route, method).observe(queries)
+        REQUESTS.labels(route, method, response.status_code).inc()
+        update_process_metrics()
@@ -2,6 +2,8 @@
 Database models
 """
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.contrib.auth.models import (
     AbstractBaseUser,
     PermissionsMixin,
@@ -25,12 +27,9 @@ class UserManager(BaseUserManager):
         """For creating superuser"""
         if not email:
             raise ValueError("Email must be filled")
-        user = self.create_user(email, password)
-        user.is_superuser = True
-        user.is_staff = True
-        user.save(using=self._db)
-
-        return user
+        return self.create_user(
+            email, password, is_superuser=True, is_staff=True
+        )
 
 
 class User(AbstractBaseUser, PermissionsMixin):
@@ -57,6 +56,24 @@ class Recipe(models.Model):
     price = models.DecimalField(max_digits=5, decimal_places=2)
     link = models.CharField(max_length=255, blank=True, null=True)
     tags = models.ManyToManyField('Tag')
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector('title', weight='A', config='english')
+            + SearchVector('description', weight='B', config='english')
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-id'], name='recipe_user_id_idx'),
+            models.Index(fields=['user', 'price'], name='recipe_user_price_idx'),
+            models.Index(
+                fields=['user', 'time_minutes'], name='recipe_user_time_idx'
+            ),
+            GinIndex(fields=['search_vector'], name='recipe_search_idx'),
+        ]
 
     def __str__(self):
         return self.title
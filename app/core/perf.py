@@ -0,0 +1,134 @@
+"""
+Query count and latency harness for the API endpoints, and benchmark
+data.
+"""
+import json
+import math
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.models import Recipe, Tag
+
+
+def benchmark_recipes(email, count):
+    """Create a user with count tagged recipes and return their queryset.
+
+    Meant to run inside a transaction that is rolled back.
+    """
+    user = get_user_model().objects.create_user(email=email)
+    tags = Tag.objects.bulk_create(
+        Tag(user=user, name=name)
+        for name in ('vegan', 'dinner', 'quick', 'crème brûlée')
+    )
+    recipes = Recipe.objects.bulk_create(
+        Recipe(
+            user=user,
+            title=f'Recipe {number}',
+            description='Slow cooked, serves 4 — "best" ' * 3,
+            time_minutes=number % 180,
+            price=Decimal(number % 10000) / 100,
+            link=f'https://example.com/{number}' if number % 3 else None,
+        )
+        for number in range(count)
+    )
+    Recipe.tags.through.objects.bulk_create(
+        Recipe.tags.through(recipe_id=recipe.id, tag_id=tag.id)
+        for recipe in recipes
+        for tag in tags[:recipe.id % len(tags)]
+    )
+    return Recipe.objects.filter(user=user).order_by('-id')
+
+
+def measure(request):
+    """Run request() and return (response, query count, wall time in ms)."""
+    with CaptureQueriesContext(connection) as ctx:
+        start = time.perf_counter()
+        response = request()
+        if getattr(response, 'streaming', False):
+            b''.join(response.streaming_content)
+        elapsed = (time.perf_counter() - start) * 1000
+    return response, len(ctx), elapsed
+
+
+class PerformanceHarness:
+    """Record queries and wall time per endpoint and dataset size.
+
+    An endpoint fails when its query count changes with the dataset size
+    (an N+1), when it goes over the count recorded in the baseline or,
+    given max_ms, when a request takes longer than max_ms.
+    """
+
+    def __init__(self, baseline_path, max_ms=None):
+        self.baseline_path = baseline_path
+        self.max_ms = max_ms
+        try:
+            with open(baseline_path) as baseline:
+                self.baseline = json.load(baseline)
+        except FileNotFoundError:
+            self.baseline = {}
+        self.results = {}
+
+    def record(self, name, size, request, chunk_size=None):
+        """Measure request() for an endpoint at a dataset size.
+
+        Endpoints reading rows in chunks of chunk_size are allowed one
+        extra query (the prefetch) per chunk after the first.
+        """
+        response, queries, elapsed = measure(request)
+        chunks = math.ceil(size / chunk_size) if chunk_size else 1
+        self.results.setdefault(name, {})[str(size)] = {
+            'queries': queries,
+            'chunk_queries': max(chunks - 1, 0),
+            'ms': round(elapsed, 2),
+            'status': response.status_code,
+        }
+        return response
+
+    def failures(self):
+        """Return a message for each endpoint breaking its budgets."""
+        messages = []
+        for name, sizes in sorted(self.results.items()):
+            counts = {
+                int(size): result['queries'] - result['chunk_queries']
+                for size, result in sizes.items()
+            }
+            smallest = counts[min(counts)]
+            if any(count > smallest for count in counts.values()):
+                messages.append(f'{name}: queries grow with size {counts}')
+            budget = self.baseline.get(name)
+            if budget is None:
+                messages.append(f'{name}: no baseline recorded')
+            elif max(counts.values()) > budget:
+                messages.append(
+                    f'{name}: {max(counts.values())} queries, baseline {budget}'
+                )
+            slowest = max(result['ms'] for result in sizes.values())
+            if self.max_ms is not None and slowest > self.max_ms:
+                messages.append(f'{name}: took {slowest}ms, max {self.max_ms}ms')
+        return messages
+
+    def write_results(self, path):
+        """Write the measurements as JSON for comparison over time."""
+        with open(path, 'w') as results:
+            json.dump({
+                'recorded_at': datetime.now(timezone.utc).isoformat(),
+                'endpoints': self.results,
+            }, results, indent=2, sort_keys=True)
+
+    def write_baseline(self):
+        """Save the current query counts as the new baseline."""
+        self.baseline = {
+            name: max(
+                result['queries'] - result['chunk_queries']
+                for result in sizes.values()
+            )
+            for name, sizes in self.results.items()
+        }
+        with open(self.baseline_path, 'w') as output:
+            json.dump(self.baseline, output, indent=2, sort_keys=True)
+            output.write('\n')
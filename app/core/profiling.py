@@ -0,0 +1,284 @@
+"""
+Sampling request profiler.
+
+A sampled request gets a Profile that splits its wall time into sections:
+sql, auth, serializer, render and view (everything else). Time is charged
+to the innermost section, so queries run while serializing count as sql.
+Unsampled requests only pay for a context variable lookup at each
+instrumented call.
+"""
+import functools
+import logging
+import random
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in milliseconds
+BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_current = ContextVar('profile', default=None)
+
+
+class Profile:
+    """Section timings and slow queries of one request."""
+
+    def __init__(self, explain=False, forced=False):
+        self.start = self.mark = time.perf_counter()
+        self.stack = []
+        self.sections = {}
+        self.queries = 0
+        self.slow_queries = []
+        self.explain = explain
+        self.forced = forced
+
+    def enter(self, name):
+        self._charge()
+        self.stack.append(name)
+
+    def exit(self):
+        self._charge()
+        self.stack.pop()
+
+    def finish(self):
+        """Close open sections and return the timings in milliseconds."""
+        self._charge()
+        self.stack.clear()
+        timings = {
+            name: seconds * 1000 for name, seconds in self.sections.items()
+        }
+        timings['total'] = (self.mark - self.start) * 1000
+        return timings
+
+    def _charge(self):
+        now = time.perf_counter()
+        name = self.stack[-1] if self.stack else 'view'
+        self.sections[name] = self.sections.get(name, 0) + now - self.mark
+        self.mark = now
+
+
+def profiled(name):
+    """Charge calls of the decorated function to section name."""
+    def decorator(func):
+        if iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                profile = _current.get()
+                if profile is None:
+                    return await func(*args, **kwargs)
+                profile.enter(name)
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    profile.exit()
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                profile = _current.get()
+                if profile is None:
+                    return func(*args, **kwargs)
+                profile.enter(name)
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    profile.exit()
+        return wrapper
+    return decorator
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper timing queries of sampled requests."""
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    profile.enter('sql')
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        profile.exit()
+        profile.queries += 1
+        if elapsed >= settings.REQUEST_PROFILING['SLOW_QUERY_MS']:
+            profile.slow_queries.append((
+                context['connection'].alias, sql, params, many, elapsed
+            ))
+
+
+def install_query_wrapper(sender=None, connection=None, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def explain(alias, sql, params):
+    """Return the EXPLAIN plan of a query."""
+    with connections[alias].cursor() as cursor:
+        cursor.execute(f'EXPLAIN {sql}', params)
+        return '\n'.join(str(row[0]) for row in cursor.fetchall())
+
+
+def is_staff(request):
+    """Return whether the request was made by a staff user."""
+    user = getattr(request, 'user', None)
+    return bool(user and user.is_staff)
+
+
+class ProfileStats:
+    """Per-route histograms of section timings, kept per process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def record(self, route, timings, queries):
+        with self._lock:
+            entry = self._routes.setdefault(
+                route, {'count': 0, 'queries': 0, 'sections': {}}
+            )
+            entry['count'] += 1
+            entry['queries'] += queries
+            for name, ms in timings.items():
+                section = entry['sections'].setdefault(
+                    name, {'sum_ms': 0.0, 'buckets': [0] * (len(BUCKETS) + 1)}
+                )
+                section['sum_ms'] += ms
+                section['buckets'][bisect_left(BUCKETS, ms)] += 1
+
+    def snapshot(self):
+        """Return the histograms with labelled buckets."""
+        labels = [str(bound) for bound in BUCKETS] + ['+Inf']
+        with self._lock:
+            return {
+                route: {
+                    'count': entry['count'],
+                    'queries': entry['queries'],
+                    'sections': {
+                        name: {
+                            'mean_ms': round(
+                                section['sum_ms'] / entry['count'], 3
+                            ),
+                            'buckets': dict(zip(labels, section['buckets'])),
+                        }
+                        for name, section in entry['sections'].items()
+                    },
+                }
+                for route, entry in self._routes.items()
+            }
+
+    def clear(self):
+        with self._lock:
+            self._routes.clear()
+
+
+profile_stats = ProfileStats()
+
+
+class ProfilingMiddleware:
+    """Profile a sample of requests.
+
+    Enabled by REQUEST_PROFILING['ENABLED']. A request is sampled at
+    SAMPLE_RATE, or always when a staff user sends the X-Profile header;
+    token users are only known once the view ran, so a forced profile is
+    dropped afterwards for other users. Slow queries of sampled requests
+    are logged, with their EXPLAIN plan when the header is "explain" and
+    the user is staff. Streamed response bodies are produced after the
+    middleware returns and aren't timed.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_PROFILING['ENABLED']:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        connection_created.connect(install_query_wrapper)
+        for connection in connections.all(initialized_only=True):
+            install_query_wrapper(connection=connection)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        profile = self.start_profile(request)
+        if profile is None:
+            return self.get_response(request)
+        token = _current.set(profile)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        if profile.forced and not is_staff(request):
+            return response
+        self.finish_profile(request, profile)
+        if profile.explain and profile.slow_queries:
+            self.explain_slow_queries(request, profile)
+        return response
+
+    async def __acall__(self, request):
+        profile = self.start_profile(request)
+        if profile is None:
+            return await self.get_response(request)
+        token = _current.set(profile)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        if profile.forced and not is_staff(request):
+            return response
+        self.finish_profile(request, profile)
+        if profile.explain and profile.slow_queries:
+            await sync_to_async(self.explain_slow_queries)(request, profile)
+        return response
+
+    def process_template_response(self, request, response):
+        profile = _current.get()
+        if profile is not None:
+            profile.enter('render')
+            response.add_post_render_callback(
+                lambda response: profile.exit()
+            )
+        return response
+
+    def start_profile(self, request):
+        header = request.headers.get('X-Profile')
+        rate = settings.REQUEST_PROFILING['SAMPLE_RATE']
+        if random.random() < rate:
+            return Profile(explain=header == 'explain')
+        if header is None:
+            return None
+        return Profile(explain=header == 'explain', forced=True)
+
+    def finish_profile(self, request, profile):
+        timings = profile.finish()
+        match = request.resolver_match
+        view_name = match.view_name if match else '<unresolved>'
+        route = f'{request.method} {view_name}'
+        profile_stats.record(route, timings, profile.queries)
+        for alias, sql, params, many, elapsed in profile.slow_queries:
+            logger.warning(
+                'Slow query (%.1f ms) in %s: %s', elapsed, route, sql
+            )
+
+    def explain_slow_queries(self, request, profile):
+        """Log the plans of slow SELECTs when a staff user asked for them."""
+        if not is_staff(request):
+            return
+        for alias, sql, params, many, elapsed in profile.slow_queries:
+            if not many and sql.lstrip().upper().startswith('SELECT'):
+                plan = explain(alias, sql, params)
+                logger.info('EXPLAIN %s\n%s', sql, plan)
@@ -0,0 +1,105 @@
+"""
+Precomputed OpenAPI schema.
+
+Generating the schema walks every view and serializer, so it's built once
+with `manage.py build_schema` and written to API_SCHEMA_FILE. SchemaView
+serves the file from memory, rendered once per format, with a strong
+ETag. Without the file the schema is generated on each request in DEBUG,
+and is an error otherwise.
+"""
+import functools
+import hashlib
+import json
+import os
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from drf_spectacular.generators import SchemaGenerator
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView
+from rest_framework.renderers import JSONRenderer
+
+
+def generate_schema():
+    """Return the schema as drf-spectacular serves it publicly."""
+    return SchemaGenerator().get_schema(request=None, public=True)
+
+
+def write_schema(path):
+    """Generate the schema and write it to path as JSON."""
+    content = JSONRenderer().render(generate_schema())
+    # Replace the file in one step so readers never see half of it.
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+    return content
+
+
+class PrecomputedSchema:
+    """Schema read from a file, rendered once per renderer."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.data = json.load(f)
+        self._rendered = {}
+
+    def render(self, renderer):
+        """Return the (content, etag) of the schema for renderer."""
+        key = type(renderer)
+        if key not in self._rendered:
+            content = renderer.render(self.data, renderer.media_type, {})
+            etag = '"%s"' % hashlib.md5(content).hexdigest()
+            self._rendered[key] = (content, etag)
+        return self._rendered[key]
+
+
+@functools.lru_cache(maxsize=1)
+def _load_schema(path, mtime):
+    return PrecomputedSchema(path)
+
+
+def load_schema(path):
+    """Return the schema in path, None if there is none.
+
+    The file is read again only when it changes.
+    """
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    return _load_schema(path, mtime)
+
+
+class SchemaView(SpectacularAPIView):
+    # Serves the precomputed schema. The docstring is the description of
+    # the endpoint in the schema, keep drf-spectacular's.
+    __doc__ = SpectacularAPIView.__doc__
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        schema = load_schema(settings.API_SCHEMA_FILE)
+        if schema is None:
+            if settings.DEBUG:
+                return super().get(request, *args, **kwargs)
+            raise ImproperlyConfigured(
+                f'{settings.API_SCHEMA_FILE} is missing, run '
+                '`manage.py build_schema`.'
+            )
+
+        renderer = request.accepted_renderer
+        content, etag = schema.render(renderer)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            content_type = renderer.media_type
+            if renderer.charset:
+                content_type += f'; charset={renderer.charset}'
+            response = HttpResponse(content, content_type=content_type)
+            response['Content-Disposition'] = (
+                f'inline; filename="{self._get_filename(request, None)}"'
+            )
+        response['ETag'] = etag
+        patch_cache_control(response, public=True, no_cache=True)
+        return response
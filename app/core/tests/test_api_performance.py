@@ -0,0 +1,143 @@
+"""
+Query count regression tests for the API endpoints.
+
+Dataset sizes come from PERF_SIZES (default "10,1000"; add 100000 for a
+full run). Latency is only checked when PERF_MAX_MS sets a per request
+bound, since wall times vary between machines. Results are written to
+PERF_RESULTS when it's set and PERF_UPDATE_BASELINE=1 rewrites the
+baseline.
+"""
+import os
+from decimal import Decimal
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tag
+from core.perf import PerformanceHarness
+from recipe.exports import CHUNK_SIZE
+from user.authentication import token_cache
+
+BASELINE = Path(__file__).with_name('query_baseline.json')
+SIZES = [
+    int(size) for size in os.environ.get('PERF_SIZES', '10,1000').split(',')
+]
+# Endpoints streaming rows with iterator(chunk_size=CHUNK_SIZE)
+CHUNKED = {'recipe-export', 'recipe-async-list'}
+RESULTS = os.environ.get('PERF_RESULTS')
+MAX_MS = os.environ.get('PERF_MAX_MS')
+
+
+class APIPerformanceTests(TestCase):
+    """Test query counts stay flat and within the baseline."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='perf@example.com', password='razim123'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.tags = Tag.objects.bulk_create([
+            Tag(user=self.user, name=f'tag{i}') for i in range(10)
+        ])
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.harness = PerformanceHarness(
+            BASELINE, max_ms=float(MAX_MS) if MAX_MS else None
+        )
+
+    def grow(self, size):
+        """add recipes with two tags each until the user has size of them."""
+        existing = Recipe.objects.filter(user=self.user).count()
+        recipes = Recipe.objects.bulk_create([
+            Recipe(
+                user=self.user,
+                title=f'Recipe {i}',
+                description=f'Description of recipe {i}',
+                time_minutes=i % 120 + 1,
+                price=Decimal(i % 5000) / 100,
+            )
+            for i in range(existing, size)
+        ], batch_size=5000)
+        through = Recipe.tags.through
+        through.objects.bulk_create([
+            through(recipe_id=recipe.id, tag_id=tag.id)
+            for i, recipe in enumerate(recipes)
+            for tag in (self.tags[i % 10], self.tags[(i + 1) % 10])
+        ], batch_size=5000)
+
+    def endpoints(self, size):
+        """return the requests measured at every size."""
+        recipe = Recipe.objects.filter(user=self.user).latest('id')
+        detail = reverse('recipe:recipe-detail', args=[recipe.id])
+        recipes = reverse('recipe:recipe-list')
+        return {
+            'recipe-list': lambda: self.client.get(recipes),
+            'recipe-list-page': lambda: self.client.get(
+                recipes, {'page_size': 50}
+            ),
+            'recipe-list-filtered': lambda: self.client.get(recipes, {
+                'tags': f'{self.tags[0].id},{self.tags[1].id}',
+                'price_max': '20', 'time_max': 60,
+            }),
+            'recipe-search': lambda: self.client.get(
+                recipes, {'search': 'recipe 7'}
+            ),
+            'recipe-detail': lambda: self.client.get(detail),
+            'recipe-export': lambda: self.client.get(
+                reverse('recipe:recipe-export')
+            ),
+            'recipe-async-list': lambda: self.client.get(
+                reverse('recipe:async-recipe-list')
+            ),
+            'recipe-create': lambda: self.client.post(recipes, {
+                'title': 'New', 'time_minutes': 5, 'price': '1.00',
+                'tags': [{'name': 'tag0'}, {'name': f'new{size}'}],
+            }, format='json'),
+            'recipe-update': lambda: self.client.patch(
+                detail, {'title': 'Changed'}
+            ),
+            'tag-list': lambda: self.client.get(reverse('recipe:tag-list')),
+            'user-me': lambda: self.client.get(reverse('user:me')),
+            'user-token': lambda: self.client.post(reverse('user:token'), {
+                'email': self.user.email, 'password': 'razim123',
+            }),
+        }
+
+    def test_query_counts(self):
+        """test no endpoint's queries grow with data or pass the baseline."""
+        for size in sorted(SIZES):
+            self.grow(size)
+            for name, request in self.endpoints(size).items():
+                # Measure the uncached path, including authentication.
+                cache.clear()
+                token_cache.clear()
+                with self.settings(RECIPE_RESPONSE_CACHE={
+                    **settings.RECIPE_RESPONSE_CACHE, 'ENABLED': False,
+                }):
+                    response = self.harness.record(
+                        name, size, request,
+                        chunk_size=CHUNK_SIZE if name in CHUNKED else None,
+                    )
+                self.assertLess(response.status_code, 300, name)
+
+        if RESULTS:
+            self.harness.write_results(RESULTS)
+        if os.environ.get('PERF_UPDATE_BASELINE'):
+            self.harness.write_baseline()
+        failures = self.harness.failures()
+        self.assertFalse(failures, '\n'.join(failures))
+
+    def test_latency_bound(self):
+        """test requests slower than max_ms are reported."""
+        harness = PerformanceHarness(BASELINE, max_ms=0)
+        harness.record(
+            'user-me', 10, lambda: self.client.get(reverse('user:me'))
+        )
+
+        self.assertIn('user-me: took', '\n'.join(harness.failures()))
@@ -0,0 +1,52 @@
+"""
+Test the benchmark management commands.
+"""
+from importlib.util import find_spec
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TransactionTestCase
+
+from core.models import Recipe
+
+# (command, options, text expected in the report)
+BENCHMARKS = [
+    ('benchmark_compression', {'recipes': 20, 'repeat': 1}, [
+        'recipe list', 'ndjson export', 'schema', 'gzip-6', '% saved',
+    ]),
+    ('benchmark_connections', {'threads': 2, 'requests': 5}, [
+        'CONN_MAX_AGE=', '10 requests in', 'peak connections',
+    ]),
+    ('benchmark_json', {'recipes': 20, 'repeat': 1}, [
+        'json: render', 'Identical output: yes',
+        *(['orjson: render'] if find_spec('orjson') else []),
+    ]),
+    ('benchmark_list', {'page_size': 20, 'repeat': 1}, [
+        'compact:', 'expanded:', 'Saved per page:',
+    ]),
+    ('benchmark_middleware', {'seconds': 0.05}, [
+        'recipe detail:', 'tag list:', 'user:', 'API_ONLY',
+    ]),
+    ('benchmark_search', {'rows': 50, 'queries': 3}, [
+        'icontains:', 'full-text:',
+    ]),
+    ('benchmark_serializers', {'recipes': 20, 'repeat': 1}, [
+        'serializer:', 'read plan:', 'identical output: yes',
+    ]),
+]
+
+
+class BenchmarkCommandTests(TransactionTestCase):
+    """Test the benchmark commands."""
+
+    def test_reports_and_rolls_back(self):
+        """test each benchmark reports its variants and keeps no data."""
+        for command, options, expected in BENCHMARKS:
+            with self.subTest(command=command):
+                out = StringIO()
+
+                call_command(command, stdout=out, **options)
+
+                for text in expected:
+                    self.assertIn(text, out.getvalue())
+                self.assertFalse(Recipe.objects.exists())
@@ -0,0 +1,216 @@
+"""
+Tests for response compression.
+"""
+import asyncio
+import gzip
+import json
+import unittest
+import zlib
+from decimal import Decimal
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import compression
+from core.compression import CompressionMiddleware, accepted_encodings
+from core.models import Recipe
+
+RECIPES_URL = reverse('recipe:recipe-list')
+RECIPE_EXPORT_URL = reverse('recipe:recipe-export')
+BODY = json.dumps([{'title': f'Recipe {n}'} for n in range(200)]).encode()
+
+
+def json_response(content=BODY, **headers):
+    """return a JSON response with content."""
+    response = HttpResponse(content, content_type='application/json')
+    for name, value in headers.items():
+        response[name] = value
+    return response
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+    """Test compressing responses."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def process(self, response, **headers):
+        """return response passed through the middleware."""
+        request = self.factory.get('/', headers=headers)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_accepted_encodings(self):
+        """test q=0 encodings are not accepted."""
+        self.assertEqual(
+            accepted_encodings('gzip;q=0.5, br;q=0, deflate, *;q=bad'),
+            {'gzip', 'deflate'},
+        )
+
+    @mock.patch.object(compression, 'brotli', None)
+    def test_gzip(self):
+        """test gzip is used without brotli."""
+        res = self.process(json_response(), accept_encoding='gzip, br')
+
+        self.assertEqual(res['Content-Encoding'], 'gzip')
+        self.assertEqual(res['Vary'], 'Accept-Encoding')
+        self.assertEqual(res['Content-Length'], str(len(res.content)))
+        self.assertEqual(gzip.decompress(res.content), BODY)
+
+    @unittest.skipUnless(compression.brotli, 'brotli is not installed')
+    def test_brotli_preferred(self):
+        """test brotli is used when accepted."""
+        res = self.process(json_response(), accept_encoding='gzip, br')
+
+        self.assertEqual(res['Content-Encoding'], 'br')
+        self.assertEqual(compression.brotli.decompress(res.content), BODY)
+
+    def test_not_accepted(self):
+        """test responses aren't compressed without Accept-Encoding."""
+        for header in ('', 'identity', 'gzip;q=0'):
+            with self.subTest(header=header):
+                res = self.process(json_response(), accept_encoding=header)
+
+                self.assertFalse(res.has_header('Content-Encoding'))
+                self.assertEqual(res['Vary'], 'Accept-Encoding')
+                self.assertEqual(res.content, BODY)
+
+    def test_skipped_responses(self):
+        """test small, other or already encoded bodies are unchanged."""
+        other = HttpResponse(BODY, content_type='text/html')
+        encoded = json_response(**{'Content-Encoding': 'identity'})
+        with self.settings(RESPONSE_COMPRESSION={
+            **settings.RESPONSE_COMPRESSION,
+            'MIN_SIZE': len(BODY) + 1,
+        }):
+            small = self.process(json_response(), accept_encoding='gzip')
+        for res in (
+            small,
+            self.process(other, accept_encoding='gzip'),
+            self.process(encoded, accept_encoding='gzip'),
+        ):
+            self.assertEqual(res.content, BODY)
+            self.assertNotEqual(res.get('Content-Encoding'), 'gzip')
+
+    @mock.patch.object(compression, 'brotli', None)
+    def test_gzip_level(self):
+        """test GZIP_LEVEL sets the compression level."""
+        for level in (1, 9):
+            config = {**settings.RESPONSE_COMPRESSION, 'GZIP_LEVEL': level}
+            with self.settings(RESPONSE_COMPRESSION=config):
+                res = self.process(json_response(), accept_encoding='gzip')
+
+            compressor = zlib.compressobj(
+                level, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+            )
+            self.assertEqual(
+                res.content, compressor.compress(BODY) + compressor.flush()
+            )
+
+    @mock.patch.object(compression, 'brotli', None)
+    def test_weak_etag(self):
+        """test a strong ETag is made weak."""
+        res = self.process(json_response(ETag='"abc"'), accept_encoding='gzip')
+
+        self.assertEqual(res['ETag'], 'W/"abc"')
+
+    @mock.patch.object(compression, 'brotli', None)
+    def test_streaming(self):
+        """test streamed bodies are compressed chunk by chunk."""
+        chunks = [BODY[:1000], b'', BODY[1000:]]
+        response = StreamingHttpResponse(
+            iter(chunks), content_type='application/x-ndjson'
+        )
+
+        res = self.process(response, accept_encoding='gzip')
+        compressed = list(res.streaming_content)
+
+        self.assertEqual(res['Content-Encoding'], 'gzip')
+        self.assertFalse(res.has_header('Content-Length'))
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        # Each chunk is flushed, so it decompresses on arrival.
+        self.assertEqual(decompressor.decompress(compressed[0]), chunks[0])
+        self.assertEqual(
+            gzip.decompress(b''.join(compressed)), b''.join(chunks)
+        )
+
+    @mock.patch.object(compression, 'brotli', None)
+    def test_async_streaming(self):
+        """test async streamed bodies are compressed."""
+        async def chunks():
+            yield BODY[:1000]
+            yield BODY[1000:]
+
+        async def get_response(request):
+            return StreamingHttpResponse(
+                chunks(), content_type='application/json'
+            )
+
+        async def fetch():
+            middleware = CompressionMiddleware(get_response)
+            request = self.factory.get('/', headers={
+                'accept_encoding': 'gzip',
+            })
+            res = await middleware(request)
+            return [chunk async for chunk in res.streaming_content]
+
+        compressed = asyncio.run(fetch())
+
+        self.assertEqual(gzip.decompress(b''.join(compressed)), BODY)
+
+
+@mock.patch.object(compression, 'brotli', None)
+class CompressionAPITests(TestCase):
+    """Test compression of the APIs."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com', password='test123'
+        )
+        for n in range(50):
+            Recipe.objects.create(
+                user=self.user, title=f'Recipe {n}', time_minutes=5,
+                price=Decimal('1.00'), description='Boil water. ' * 5,
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_list_compressed(self):
+        """test the recipe list is compressed."""
+        res = self.client.get(RECIPES_URL, HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Encoding'], 'gzip')
+        self.assertEqual(len(json.loads(gzip.decompress(res.content))), 50)
+
+    def test_export_compressed(self):
+        """test the streamed export is compressed."""
+        res = self.client.get(RECIPE_EXPORT_URL, HTTP_ACCEPT_ENCODING='gzip')
+
+        content = gzip.decompress(b''.join(res.streaming_content))
+        self.assertEqual(len(content.splitlines()), 50)
+
+    @override_settings(RECIPE_RESPONSE_CACHE={
+        'ENABLED': True, 'ALIAS': 'default', 'TIMEOUT': 300,
+    })
+    def test_revalidate_weak_etag(self):
+        """test the weak ETag of a compressed response revalidates."""
+        first = self.client.get(RECIPES_URL, HTTP_ACCEPT_ENCODING='gzip')
+        etag = first['ETag']
+
+        res = self.client.get(
+            RECIPES_URL, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertTrue(etag.startswith('W/'))
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
@@ -0,0 +1,111 @@
+"""
+Test the import_recipes management command.
+"""
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from core.models import Recipe
+from recipe.caching import get_version
+
+
+class ImportRecipesCommandTests(TestCase):
+    """Test importing recipes from a file."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com', password='test123'
+        )
+
+    def write_file(self, content, suffix, encoding='utf-8'):
+        """write content to a temporary file and return its path."""
+        upload = tempfile.NamedTemporaryFile(
+            'w', suffix=suffix, encoding=encoding, delete=False
+        )
+        with upload:
+            upload.write(content)
+        self.addCleanup(os.remove, upload.name)
+        return upload.name
+
+    def test_import_in_batches(self):
+        """test rows are imported in batches with progress output."""
+        rows = [
+            {'title': f'Recipe {i}', 'time_minutes': 1, 'price': '1.00'}
+            for i in range(5)
+        ]
+        rows.append({'title': 'bad'})
+        path = self.write_file(
+            '\n'.join(json.dumps(row) for row in rows), '.ndjson'
+        )
+        out, err = StringIO(), StringIO()
+
+        call_command(
+            'import_recipes', path, user=self.user.email, batch_size=2,
+            stdout=out, stderr=err,
+        )
+
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 5)
+        self.assertIn('Imported 5 recipes, skipped 1 rows.', out.getvalue())
+        self.assertEqual(out.getvalue().count('rows skipped...'), 3)
+        self.assertIn('line 6:', err.getvalue())
+
+    def test_import_csv(self):
+        """test a CSV file is detected by its extension."""
+        path = self.write_file(
+            'title,time_minutes,price,tags\nSoup,10,3.50,Hot;Lunch\n', '.csv'
+        )
+
+        call_command('import_recipes', path, user=self.user.email,
+                     stdout=StringIO())
+
+        recipe = Recipe.objects.get(user=self.user)
+        self.assertEqual(recipe.tags.count(), 2)
+
+    def test_unknown_user(self):
+        """test importing for an unknown user fails."""
+        path = self.write_file('', '.ndjson')
+
+        with self.assertRaises(CommandError):
+            call_command('import_recipes', path, user='nobody@example.com')
+
+    def test_import_csv_with_bom(self):
+        """test a CSV file starting with a BOM imports."""
+        path = self.write_file(
+            'title,time_minutes,price\nSoup,10,3.50\n', '.csv',
+            encoding='utf-8-sig',
+        )
+
+        call_command('import_recipes', path, user=self.user.email,
+                     stdout=StringIO())
+
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 1)
+
+    def test_not_utf8(self):
+        """test a file that isn't UTF-8 fails with a command error."""
+        path = self.write_file(
+            'title,time_minutes,price\nCrème,10,3.50\n', '.csv',
+            encoding='latin-1',
+        )
+
+        with self.assertRaisesMessage(CommandError, 'not UTF-8'):
+            call_command('import_recipes', path, user=self.user.email,
+                         stdout=StringIO())
+
+    def test_import_invalidates_cached_responses(self):
+        """test importing bumps the user's response cache version."""
+        path = self.write_file(
+            'title,time_minutes,price\nSoup,10,3.50\n', '.csv'
+        )
+        version = get_version(self.user.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('import_recipes', path, user=self.user.email,
+                         stdout=StringIO())
+
+        self.assertNotEqual(get_version(self.user.pk), version)
@@ -0,0 +1,73 @@
+"""
+Test the generate_data and load_test management commands.
+"""
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import LiveServerTestCase, TestCase
+
+from core.models import Recipe, Tag
+
+
+class GenerateDataCommandTests(TestCase):
+    """Test generating synthetic data."""
+
+    def test_generate_skewed_data(self):
+        """test users, tags and recipes are created with skew."""
+        out = StringIO()
+
+        call_command(
+            'generate_data', users=5, recipes=200, tags=3, skew=2,
+            batch_size=50, seed=1, prefix='gen', stdout=out,
+        )
+
+        users = get_user_model().objects.filter(email__startswith='gen-')
+        self.assertEqual(users.count(), 5)
+        self.assertEqual(Tag.objects.count(), 15)
+        self.assertEqual(Recipe.objects.count(), 200)
+        self.assertGreater(
+            Recipe.objects.filter(user__email='gen-0@example.com').count(),
+            Recipe.objects.filter(user__email='gen-4@example.com').count(),
+        )
+        self.assertTrue(users.first().check_password('loadtest123'))
+        self.assertIn(
+            'Generated 5 users, 15 tags and 200 recipes.', out.getvalue()
+        )
+
+    def test_existing_prefix_error(self):
+        """test generating twice with one prefix is refused."""
+        call_command('generate_data', users=1, recipes=1, stdout=StringIO())
+
+        with self.assertRaises(CommandError):
+            call_command('generate_data', users=1, recipes=1)
+
+
+class LoadTestCommandTests(LiveServerTestCase):
+    """Test driving load against a live server."""
+
+    def test_reports_percentiles(self):
+        """test every endpoint is hit and reported without errors."""
+        call_command(
+            'generate_data', users=2, recipes=20, seed=1, stdout=StringIO()
+        )
+        out = StringIO()
+
+        call_command(
+            'load_test', url=self.live_server_url, users=2, concurrency=2,
+            duration=2, seed=1, mix='token=1,list=1,detail=1,create=1,update=1',
+            stdout=out,
+        )
+
+        lines = out.getvalue().splitlines()
+        self.assertIn('p99 ms', lines[0])
+        rows = {line.split()[0]: line.split() for line in lines[1:]}
+        for name in ('token', 'list', 'detail', 'create', 'update', 'total'):
+            self.assertIn(name, rows)
+            self.assertEqual(rows[name][2], '0')
+
+    def test_invalid_mix_error(self):
+        """test an unknown endpoint in the mix is refused."""
+        with self.assertRaises(CommandError):
+            call_command('load_test', mix='list=1,delete=1')
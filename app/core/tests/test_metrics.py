@@ -0,0 +1,178 @@
+"""
+Tests for the Prometheus metrics.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.metrics import sync_token_cache
+from core.models import Recipe
+from user.authentication import token_cache
+
+METRICS_URL = reverse('metrics')
+RECIPES_URL = reverse('recipe:recipe-list')
+ROUTE = {'route': 'recipe:recipe-list', 'method': 'GET'}
+
+
+def sample(name, labels=None):
+    """return the current value of a sample, 0 if it doesn't exist."""
+    return REGISTRY.get_sample_value(name, labels or {}) or 0
+
+
+@override_settings(METRICS_ENABLED=True, METRICS_TOKEN=None)
+class MetricsTests(TestCase):
+    """Test recording and serving metrics."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com', password='test123'
+        )
+        Recipe.objects.create(
+            user=self.user, title='Soup', time_minutes=5,
+            price=Decimal('1.00'),
+        )
+        token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        token_cache.clear()
+        sync_token_cache()
+
+    def test_request_metrics(self):
+        """test requests are counted and timed by route name."""
+        requests = sample(
+            'django_http_requests_total', {**ROUTE, 'status': '200'}
+        )
+        timed = sample('django_http_request_duration_seconds_count', ROUTE)
+        queries = sample('django_http_request_db_queries_sum', ROUTE)
+
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            sample('django_http_requests_total', {**ROUTE, 'status': '200'}),
+            requests + 1,
+        )
+        self.assertEqual(
+            sample('django_http_request_duration_seconds_count', ROUTE),
+            timed + 1,
+        )
+        self.assertGreater(
+            sample('django_http_request_db_queries_sum', ROUTE), queries
+        )
+
+    def test_metrics_endpoint(self):
+        """test the endpoint serves the exposition format."""
+        self.client.get(RECIPES_URL)
+        self.client.get(RECIPES_URL)
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res['Content-Type'].startswith('text/plain'))
+        body = res.content.decode()
+        self.assertIn(
+            'django_http_requests_total{method="GET",'
+            'route="recipe:recipe-list",status="200"}',
+            body,
+        )
+        self.assertIn('django_http_request_db_queries_bucket', body)
+        self.assertIn('auth_token_cache_lookups_total{result="hit"}', body)
+        self.assertIn('auth_token_cache_hit_ratio', body)
+
+    def test_unresolved_route(self):
+        """test unknown urls share one label."""
+        before = sample(
+            'django_http_requests_total',
+            {'route': '<unresolved>', 'method': 'GET', 'status': '404'},
+        )
+
+        self.client.get('/no-such-page/')
+
+        self.assertEqual(
+            sample(
+                'django_http_requests_total',
+                {'route': '<unresolved>', 'method': 'GET', 'status': '404'},
+            ),
+            before + 1,
+        )
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_disabled(self):
+        """test the endpoint is gone when metrics are disabled."""
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_token_required(self):
+        """test scrapes must send the token when one is set."""
+        self.client.credentials()
+        missing = self.client.get(METRICS_URL)
+        wrong = self.client.get(
+            METRICS_URL, headers={'Authorization': 'Bearer other'}
+        )
+        res = self.client.get(
+            METRICS_URL, headers={'Authorization': 'Bearer secret'}
+        )
+
+        self.assertEqual(missing.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(wrong.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+
+WORKER = """
+import django
+django.setup()
+from django.test.utils import setup_test_environment
+setup_test_environment()
+from django.test import Client
+Client().get('/no-such-page/')
+"""
+SCRAPE = """
+import django
+django.setup()
+from core.metrics import collect_metrics
+print(collect_metrics().decode())
+"""
+
+
+class MultiprocessMetricsTests(SimpleTestCase):
+    """Test metrics aggregate across worker processes."""
+
+    def run_python(self, code, directory):
+        """run code in a fresh interpreter using the metrics directory."""
+        env = {
+            **os.environ,
+            'PROMETHEUS_MULTIPROC_DIR': directory,
+            'METRICS_ENABLED': 'true',
+            'DJANGO_SETTINGS_MODULE': 'app.settings',
+        }
+        return subprocess.run(
+            [sys.executable, '-c', code], env=env, cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout
+
+    def test_aggregates_workers(self):
+        """test requests served by two processes are summed."""
+        with tempfile.TemporaryDirectory() as directory:
+            self.run_python(WORKER, directory)
+            self.run_python(WORKER, directory)
+
+            body = self.run_python(SCRAPE, directory)
+
+        self.assertIn(
+            'django_http_requests_total{method="GET",'
+            'route="<unresolved>",status="404"} 2.0',
+            body,
+        )
@@ -0,0 +1,126 @@
+"""
+Tests for the API_ONLY middleware mode.
+"""
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import (
+    AsyncClient,
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.middleware import CsrfViewMiddleware
+
+TAGS_URL = reverse('recipe:tag-list')
+ASYNC_ME_URL = reverse('user:async-me')
+ADMIN_URL = reverse('admin:index')
+PROFILING_URL = reverse('api-profiling')
+DOCS_URL = reverse('api-docs')
+
+
+def view(request):
+    return HttpResponse()
+
+
+class CsrfTests(SimpleTestCase):
+    """Test CSRF checks of API_ONLY."""
+
+    def check_csrf(self, path):
+        """return the CSRF middleware's response to a POST to path."""
+        request = RequestFactory().post(path)
+        middleware = CsrfViewMiddleware(view)
+        return middleware.process_view(request, view, (), {})
+
+    @override_settings(API_ONLY=True)
+    def test_api_skips_csrf(self):
+        """test API requests aren't CSRF checked."""
+        self.assertIsNone(self.check_csrf('/api/recipe/'))
+        self.assertEqual(
+            self.check_csrf('/admin/').status_code, status.HTTP_403_FORBIDDEN
+        )
+
+    @override_settings(API_ONLY=False)
+    def test_api_checked_by_default(self):
+        """test API requests are CSRF checked without API_ONLY."""
+        self.assertEqual(
+            self.check_csrf('/api/recipe/').status_code,
+            status.HTTP_403_FORBIDDEN,
+        )
+
+
+class APIOnlyTests(TestCase):
+    """Test the middleware skipped by API_ONLY."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser(
+            email='admin@example.com', password='test123'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+
+    @override_settings(API_ONLY=False)
+    def test_full_stack(self):
+        """test API requests go through all middleware by default."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+        res = self.client.get(TAGS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['X-Frame-Options'], 'DENY')
+
+    @override_settings(API_ONLY=True)
+    def test_api_skips_browser_middleware(self):
+        """test API requests skip browser middleware."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+        res = self.client.get(TAGS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(res.has_header('X-Frame-Options'))
+        self.assertFalse(hasattr(res.wsgi_request, 'session'))
+
+    @override_settings(API_ONLY=True)
+    def test_api_ignores_session(self):
+        """test a session doesn't authenticate API requests."""
+        self.client.force_login(self.user)
+
+        res = self.client.get(PROFILING_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(API_ONLY=True)
+    def test_admin_keeps_middleware(self):
+        """test the admin keeps sessions and clickjacking protection."""
+        self.client.force_login(self.user)
+
+        res = self.client.get(ADMIN_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['X-Frame-Options'], 'DENY')
+        self.assertEqual(res.wsgi_request.user, self.user)
+
+    @override_settings(API_ONLY=True)
+    def test_docs_keep_clickjacking_protection(self):
+        """test the HTML API docs keep X-Frame-Options."""
+        res = self.client.get(DOCS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['X-Frame-Options'], 'DENY')
+
+    @override_settings(API_ONLY=True)
+    async def test_async_api(self):
+        """test async API views work without the browser middleware."""
+        client = AsyncClient()
+
+        res = await client.get(
+            ASYNC_ME_URL, headers={'authorization': f'Token {self.token.key}'}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(res.has_header('X-Frame-Options'))
@@ -0,0 +1,195 @@
+"""
+Tests for the request profiling middleware and stats endpoint.
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.models import Recipe
+from core.profiling import BUCKETS, Profile, profile_stats
+from user.authentication import token_cache
+
+RECIPES_URL = reverse('recipe:recipe-list')
+ASYNC_RECIPES_URL = reverse('recipe:async-recipe-list')
+PROFILING_URL = reverse('api-profiling')
+LIST_ROUTE = 'GET recipe:recipe-list'
+
+
+def profiling(**params):
+    """return REQUEST_PROFILING settings with params applied."""
+    defaults = {'ENABLED': True, 'SAMPLE_RATE': 1, 'SLOW_QUERY_MS': 1000}
+    defaults.update(params)
+    return override_settings(REQUEST_PROFILING=defaults)
+
+
+class ProfileTests(TestCase):
+    """Test charging time to sections."""
+
+    def test_nested_sections_charged_exclusively(self):
+        """test time is charged to the innermost section only."""
+        profile = Profile()
+        profile.enter('serializer')
+        profile.enter('sql')
+        profile.exit()
+        profile.exit()
+
+        timings = profile.finish()
+
+        self.assertEqual(
+            set(timings), {'view', 'serializer', 'sql', 'total'}
+        )
+        self.assertAlmostEqual(
+            timings['view'] + timings['serializer'] + timings['sql'],
+            timings['total'],
+        )
+
+
+class ProfilingMiddlewareTests(TestCase):
+    """Test profiling API requests."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com', password='test123'
+        )
+        Recipe.objects.create(
+            user=self.user, title='Soup', time_minutes=5,
+            price=Decimal('1.00'),
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        profile_stats.clear()
+        token_cache.clear()
+        self.addCleanup(profile_stats.clear)
+
+    @profiling()
+    def test_sampled_request_sections(self):
+        """test a sampled request records every section."""
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        entry = profile_stats.snapshot()[LIST_ROUTE]
+        self.assertEqual(entry['count'], 1)
+        self.assertGreater(entry['queries'], 0)
+        self.assertEqual(
+            set(entry['sections']),
+            {'view', 'auth', 'sql', 'serializer', 'render', 'total'},
+        )
+        total = entry['sections']['total']
+        self.assertEqual(len(total['buckets']), len(BUCKETS) + 1)
+        self.assertEqual(sum(total['buckets'].values()), 1)
+
+    @profiling()
+    def test_async_request_sections(self):
+        """test async views are profiled too."""
+        self.client.get(ASYNC_RECIPES_URL)
+
+        entry = profile_stats.snapshot()['GET recipe:async-recipe-list']
+        self.assertIn('auth', entry['sections'])
+        self.assertIn('sql', entry['sections'])
+
+    @profiling(SAMPLE_RATE=0)
+    def test_unsampled_request(self):
+        """test requests outside the sample aren't recorded."""
+        self.client.get(RECIPES_URL)
+
+        self.assertEqual(profile_stats.snapshot(), {})
+
+    @profiling(SAMPLE_RATE=0)
+    def test_header_forces_profile(self):
+        """test the X-Profile header profiles a staff user's request."""
+        self.user.is_staff = True
+        self.user.save()
+
+        self.client.get(RECIPES_URL, headers={'X-Profile': '1'})
+
+        self.assertEqual(profile_stats.snapshot()[LIST_ROUTE]['count'], 1)
+
+    @profiling(SAMPLE_RATE=0)
+    def test_header_ignored_for_users(self):
+        """test other users can't force profiling with the header."""
+        self.client.get(RECIPES_URL, headers={'X-Profile': '1'})
+        self.client.get(ASYNC_RECIPES_URL, headers={'X-Profile': '1'})
+
+        self.assertEqual(profile_stats.snapshot(), {})
+
+    @profiling(ENABLED=False)
+    def test_disabled(self):
+        """test nothing is recorded when profiling is disabled."""
+        self.client.get(RECIPES_URL, headers={'X-Profile': '1'})
+
+        self.assertEqual(profile_stats.snapshot(), {})
+
+    @profiling(SLOW_QUERY_MS=0)
+    def test_slow_queries_logged(self):
+        """test slow queries are logged without plans by default."""
+        with self.assertLogs('core.profiling') as logs:
+            self.client.get(RECIPES_URL)
+
+        self.assertTrue(any('Slow query' in line for line in logs.output))
+        self.assertFalse(any('EXPLAIN' in line for line in logs.output))
+
+    @profiling(SLOW_QUERY_MS=0)
+    def test_explain_for_staff(self):
+        """test staff can ask for plans of slow queries."""
+        self.user.is_staff = True
+        self.user.save()
+
+        with self.assertLogs('core.profiling') as logs:
+            self.client.get(RECIPES_URL, headers={'X-Profile': 'explain'})
+
+        plans = [line for line in logs.output if 'EXPLAIN' in line]
+        self.assertTrue(plans)
+        self.assertIn('Scan', plans[0])
+
+    @profiling(SLOW_QUERY_MS=0)
+    def test_explain_refused_for_users(self):
+        """test other users don't get plans."""
+        with self.assertLogs('core.profiling') as logs:
+            self.client.get(RECIPES_URL, headers={'X-Profile': 'explain'})
+
+        self.assertFalse(any('EXPLAIN' in line for line in logs.output))
+
+
+class ProfilingStatsAPITests(TestCase):
+    """Test the profiling stats endpoint."""
+
+    def setUp(self):
+        self.client = APIClient()
+        profile_stats.clear()
+        self.addCleanup(profile_stats.clear)
+
+    def test_staff_required(self):
+        """test only staff can read the stats."""
+        user = get_user_model().objects.create_user(
+            email='user@example.com', password='test123'
+        )
+        self.client.force_authenticate(user)
+
+        res = self.client.get(PROFILING_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_read_and_clear_stats(self):
+        """test staff can read and reset the histograms."""
+        admin = get_user_model().objects.create_superuser(
+            'admin@example.com', 'test123'
+        )
+        self.client.force_authenticate(admin)
+        profile = Profile()
+        profile_stats.record(LIST_ROUTE, profile.finish(), 2)
+
+        res = self.client.get(PROFILING_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data[LIST_ROUTE]['queries'], 2)
+
+        res = self.client.delete(PROFILING_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(profile_stats.snapshot(), {})
@@ -0,0 +1,88 @@
+"""
+Tests for the orjson renderer and parser.
+"""
+import datetime
+import io
+import unittest
+from decimal import Decimal
+from importlib.util import find_spec
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+if find_spec('orjson'):
+    from core.renderers import ORJSONParser, ORJSONRenderer
+
+
+@unittest.skipUnless(find_spec('orjson'), 'orjson is not installed')
+class ORJSONRendererTests(SimpleTestCase):
+    """Test the orjson renderer matches DRF's."""
+
+    def assertSameRender(self, data, *args):
+        """assert both renderers produce the same bytes."""
+        self.assertEqual(
+            ORJSONRenderer().render(data, *args),
+            JSONRenderer().render(data, *args),
+        )
+
+    def test_render_like_drf(self):
+        """test values are rendered byte for byte like DRF."""
+        utc = datetime.timezone.utc
+        self.assertSameRender({
+            'price': Decimal('5.20'),
+            'created': datetime.datetime(2024, 1, 2, 3, 4, 5, 678901, utc),
+            'day': datetime.date(2024, 1, 2),
+            'at': datetime.time(3, 4, 5, 678901),
+            'name': 'crème brûlée',
+            'label': gettext_lazy('Recipe'),
+            'line': 'a\u2028b\u2029c',
+            'tags': [{'id': 1, 'name': 'vegan'}],
+            'link': None,
+        })
+
+    def test_non_string_keys(self):
+        """test integer keys are rendered as strings."""
+        self.assertSameRender({1: 'one'})
+
+    def test_indent_falls_back(self):
+        """test indented output is left to DRF's renderer."""
+        self.assertSameRender(
+            {'tags': [1, 2]}, 'application/json; indent=4'
+        )
+
+    def test_render_none(self):
+        """test None renders an empty body."""
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+
+@unittest.skipUnless(find_spec('orjson'), 'orjson is not installed')
+class ORJSONParserTests(SimpleTestCase):
+    """Test the orjson parser."""
+
+    def test_parse_like_drf(self):
+        """test bodies are parsed like DRF's parser."""
+        body = '{"title": "crème", "price": "5.20", "tags": [{"id": 1}]}'
+
+        self.assertEqual(
+            ORJSONParser().parse(io.BytesIO(body.encode())),
+            JSONParser().parse(io.BytesIO(body.encode())),
+        )
+
+    def test_parse_other_encoding(self):
+        """test bodies in the request's encoding are decoded."""
+        body = '{"title": "crème"}'.encode('latin-1')
+
+        data = ORJSONParser().parse(
+            io.BytesIO(body), parser_context={'encoding': 'latin-1'}
+        )
+
+        self.assertEqual(data, {'title': 'crème'})
+
+    def test_invalid_json(self):
+        """test malformed bodies raise a parse error."""
+        for body in (b'{"title": ', b'{"price": NaN}', b'\xff'):
+            with self.assertRaises(ParseError):
+                ORJSONParser().parse(io.BytesIO(body))
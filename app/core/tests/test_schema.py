@@ -0,0 +1,105 @@
+"""
+Tests for the precomputed OpenAPI schema.
+"""
+import gzip
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from drf_spectacular.renderers import OpenApiJsonRenderer
+from rest_framework import status
+
+from core.schema import generate_schema
+
+SCHEMA_URL = reverse('api-schema')
+
+
+class SchemaTests(SimpleTestCase):
+    """Test building and serving the schema."""
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.path = os.path.join(tmp_dir.name, 'schema.json')
+        settings = override_settings(API_SCHEMA_FILE=self.path)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_build_schema(self):
+        """test the command writes the schema to API_SCHEMA_FILE."""
+        out = StringIO()
+
+        call_command('build_schema', stdout=out)
+
+        with open(self.path) as f:
+            self.assertIn('/api/recipe/recipes/', json.load(f)['paths'])
+        self.assertIn(self.path, out.getvalue())
+
+    def test_serves_built_schema(self):
+        """test the built schema is served like a generated one."""
+        call_command('build_schema', stdout=StringIO())
+
+        res = self.client.get(SCHEMA_URL, {'format': 'json'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], OpenApiJsonRenderer.media_type)
+        self.assertEqual(
+            res.content, OpenApiJsonRenderer().render(generate_schema())
+        )
+        self.assertEqual(res['Cache-Control'], 'public, no-cache')
+        self.assertFalse(res['ETag'].startswith('W/'))
+
+    def test_yaml_and_json_etags(self):
+        """test each format has its own ETag."""
+        call_command('build_schema', stdout=StringIO())
+
+        yaml = self.client.get(SCHEMA_URL)
+        json_res = self.client.get(SCHEMA_URL, {'format': 'json'})
+
+        self.assertTrue(yaml.content.startswith(b'openapi:'))
+        self.assertNotEqual(yaml['ETag'], json_res['ETag'])
+
+    def test_if_none_match(self):
+        """test a matching ETag, weak or not, returns 304."""
+        call_command('build_schema', stdout=StringIO())
+        compressed = self.client.get(SCHEMA_URL, HTTP_ACCEPT_ENCODING='gzip')
+        etag = compressed['ETag']
+
+        res = self.client.get(SCHEMA_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertTrue(etag.startswith('W/'))
+        self.assertTrue(gzip.decompress(compressed.content))
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res.content, b'')
+
+    def test_rebuilt_schema_served(self):
+        """test a rebuilt file replaces the served schema."""
+        call_command('build_schema', stdout=StringIO())
+        first = self.client.get(SCHEMA_URL, {'format': 'json'})
+        with open(self.path, 'w') as f:
+            json.dump({'openapi': '3.0.3'}, f)
+        os.utime(self.path, ns=(0, 0))
+
+        res = self.client.get(SCHEMA_URL, {'format': 'json'})
+
+        self.assertNotEqual(res['ETag'], first['ETag'])
+        self.assertEqual(res.json(), {'openapi': '3.0.3'})
+
+    @override_settings(DEBUG=True)
+    def test_missing_schema_generated_in_debug(self):
+        """test the schema is generated without a file in DEBUG."""
+        res = self.client.get(SCHEMA_URL, {'format': 'json'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('/api/recipe/recipes/', res.json()['paths'])
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_missing_schema_error(self):
+        """test a missing file is an error outside DEBUG."""
+        with self.assertRaises(ImproperlyConfigured):
+            self.client.get(SCHEMA_URL)
@@ -0,0 +1,83 @@
+"""
+Tests for the environment driven settings.
+"""
+import os
+import subprocess
+import sys
+import unittest
+from importlib.util import find_spec
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+
+def load_settings(code, **env):
+    """return the output of code run after loading settings with env."""
+    env = {
+        **os.environ,
+        'DJANGO_SETTINGS_MODULE': 'app.settings',
+        **env,
+    }
+    env.pop('DB_CONN_MAX_AGE', None)
+    return subprocess.run(
+        [sys.executable, '-c', code], env=env, cwd=settings.BASE_DIR,
+        capture_output=True, text=True,
+    )
+
+
+class SettingsTests(SimpleTestCase):
+    """Test settings read from the environment."""
+
+    def test_asgi_disables_persistent_connections(self):
+        """test serving ASGI defaults CONN_MAX_AGE to 0."""
+        code = (
+            'import app.asgi\n'
+            'from django.conf import settings\n'
+            "print(settings.DATABASES['default']['CONN_MAX_AGE'])\n"
+        )
+
+        result = load_settings(code)
+
+        self.assertEqual(result.stdout.strip(), '0', result.stderr)
+
+    @unittest.skipIf(find_spec('psycopg_pool'), 'psycopg_pool is installed')
+    def test_pool_needs_psycopg_pool(self):
+        """test DB_POOL without psycopg[pool] is a configuration error."""
+        code = 'from django.conf import settings\nsettings.DATABASES\n'
+
+        result = load_settings(code, DB_POOL='true')
+
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn('ImproperlyConfigured', result.stderr)
+        self.assertIn('psycopg[pool]', result.stderr)
+
+    def test_unknown_password_hasher(self):
+        """test an unknown PASSWORD_HASHER lists the valid choices."""
+        code = 'from django.conf import settings\nsettings.PASSWORD_HASHERS\n'
+
+        result = load_settings(code, PASSWORD_HASHER='md5')
+
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn('ImproperlyConfigured', result.stderr)
+        self.assertIn("'md5', choose one of: scrypt, argon2, pbkdf2",
+                      result.stderr)
+
+    @unittest.skipIf(find_spec('orjson'), 'orjson is installed')
+    def test_orjson_needs_package(self):
+        """test API_JSON=orjson without orjson is a configuration error."""
+        code = 'from django.conf import settings\nsettings.REST_FRAMEWORK\n'
+
+        result = load_settings(code, API_JSON='orjson')
+
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn('ImproperlyConfigured', result.stderr)
+        self.assertIn('pip install orjson', result.stderr)
+
+    def test_unknown_api_json(self):
+        """test an unknown API_JSON lists the valid choices."""
+        code = 'from django.conf import settings\nsettings.REST_FRAMEWORK\n'
+
+        result = load_settings(code, API_JSON='ujson')
+
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("'ujson', choose one of: json, orjson", result.stderr)
@@ -0,0 +1,83 @@
+"""
+Shared views for the APIs.
+"""
+import io
+
+from django.http import HttpResponse
+from django.utils.decorators import classonlymethod
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from drf_spectacular.utils import extend_schema
+from rest_framework import authentication, exceptions, permissions, status
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+
+from core.profiling import profile_stats
+from user.authentication import CachedTokenAuthentication
+
+
+class AsyncTokenAPIView(View):
+    """Async JSON view authenticated with a token.
+
+    Runs natively under ASGI: authentication and queries use the async
+    ORM so slow clients don't hold a worker thread. DRF exceptions raised
+    by handlers are rendered like DRF does.
+    """
+    authentication = CachedTokenAuthentication()
+    # The JSON renderer and parser configured for the APIs.
+    renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+    parser = api_settings.DEFAULT_PARSER_CLASSES[0]()
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        # Token authenticated, like DRF views, so CSRF doesn't apply.
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            result = await self.authentication.aauthenticate(request)
+            if result is None:
+                raise exceptions.NotAuthenticated()
+            request.user, request.auth = result
+            return await super().dispatch(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            data = exc.detail
+            if not isinstance(data, (list, dict)):
+                data = {'detail': data}
+            response = self.render(data, exc.status_code)
+            if isinstance(exc, (exceptions.NotAuthenticated,
+                                exceptions.AuthenticationFailed)):
+                response['WWW-Authenticate'] = (
+                    self.authentication.authenticate_header(request)
+                )
+            return response
+
+    def render(self, data, status=status.HTTP_200_OK):
+        """Return data as a JSON response."""
+        return HttpResponse(
+            self.renderer.render(data),
+            status=status,
+            content_type='application/json',
+        )
+
+    def parse(self, request):
+        """Return the JSON request body."""
+        return self.parser.parse(io.BytesIO(request.body or b'{}'))
+
+
+@extend_schema(exclude=True)
+class ProfilingStatsView(APIView):
+    """Per-route request profiling histograms of this process."""
+    authentication_classes = [
+        CachedTokenAuthentication,
+        authentication.SessionAuthentication,
+    ]
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(profile_stats.snapshot())
+
+    def delete(self, request):
+        profile_stats.clear()
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,126 @@
+"""
+Per-user response caching for the recipe APIs.
+"""
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+
+
+def get_cache():
+    """Return the cache backend used for recipe responses."""
+    return caches[settings.RECIPE_RESPONSE_CACHE['ALIAS']]
+
+
+def _version_key(user_id):
+    return f'recipe-version:{user_id}'
+
+
+def get_version(user_id):
+    """Return the current cache version of a user's recipes.
+
+    A missing version starts from the clock, so an evicted counter never
+    comes back with a value that old entries were stored under.
+    """
+    cache = get_cache()
+    version = cache.get(_version_key(user_id))
+    if version is None:
+        cache.add(_version_key(user_id), time.time_ns(), timeout=None)
+        version = cache.get(_version_key(user_id))
+    return version
+
+
+def bump_version(user_id):
+    """Invalidate every cached response of the user."""
+    cache = get_cache()
+    try:
+        cache.incr(_version_key(user_id))
+    except ValueError:
+        cache.set(_version_key(user_id), time.time_ns(), timeout=None)
+
+
+def bump_version_on_commit(user_id):
+    """Invalidate the user's responses once the current transaction
+    commits, so no response can be cached from a half written change."""
+    transaction.on_commit(lambda: bump_version(user_id))
+
+
+class ResponseCacheMixin:
+    """Cache rendered list/retrieve responses per user.
+
+    Entries are keyed by user, action, lookup, query params, accepted
+    media type and the user's version, which is bumped on every write.
+    Responses carry an ETag so clients can revalidate with If-None-Match.
+    """
+    cached_actions = ('list', 'retrieve')
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_response_cache_key(self, request, **kwargs):
+        """Return the cache key for this request."""
+        params = urlencode(sorted(request.query_params.lists()), doseq=True)
+        parts = [
+            str(get_version(request.user.pk)),
+            self.action,
+            str(kwargs.get(self.lookup_url_kwarg or self.lookup_field, '')),
+            request.accepted_media_type,
+            params,
+        ]
+        digest = hashlib.md5('\n'.join(parts).encode()).hexdigest()
+        return f'recipe-response:{request.user.pk}:{digest}'
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        """Serve the request from cache or render and store it."""
+        if not settings.RECIPE_RESPONSE_CACHE['ENABLED']:
+            return handler(request, *args, **kwargs)
+
+        cache = get_cache()
+        key = self.get_response_cache_key(request, **kwargs)
+        entry = cache.get(key)
+        if entry is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+
+            response.accepted_renderer = request.accepted_renderer
+            response.accepted_media_type = request.accepted_media_type
+            response.renderer_context = self.get_renderer_context()
+            response.render()
+            entry = (
+                '"%s"' % hashlib.md5(response.content).hexdigest(),
+                dict(response.items()),
+                response.content,
+            )
+            cache.set(
+                key, entry, settings.RECIPE_RESPONSE_CACHE['TIMEOUT']
+            )
+        else:
+            response = None
+
+        etag, headers, content = entry
+        # Compressed responses carry the weak form of the ETag.
+        etags = [
+            tag.removeprefix('W/')
+            for tag in parse_etags(request.headers.get('If-None-Match', ''))
+        ]
+        if etag in etags:
+            response = HttpResponseNotModified()
+        elif response is None:
+            response = HttpResponse(content, headers=headers)
+
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ['Authorization'])
+        return response
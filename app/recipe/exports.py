@@ -0,0 +1,66 @@
+"""
+Streaming exports of recipes.
+"""
+import csv
+
+from rest_framework.utils.encoders import JSONEncoder
+
+from recipe.readers import plan_for
+from recipe.serializers import RecipeDetailSerializer
+
+CHUNK_SIZE = 2000
+CSV_FIELDS = [
+    "id", "title", "description", "time_minutes", "price", "link", "tags"
+]
+
+
+class Echo:
+    """File-like object returning what is written, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def recipe_rows(queryset):
+    """Yield serialized recipes, reading the queryset in chunks."""
+    plan = plan_for(RecipeDetailSerializer)
+    return plan.serialize_chunks(queryset, CHUNK_SIZE)
+
+
+def _buffered(lines):
+    """Group lines so the response isn't written one row at a time."""
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= CHUNK_SIZE:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+def export_ndjson(queryset):
+    """Yield recipes as newline delimited JSON."""
+    encoder = JSONEncoder(ensure_ascii=False)
+    return _buffered(
+        encoder.encode(row) + '\n' for row in recipe_rows(queryset)
+    )
+
+
+def export_csv(queryset):
+    """Yield recipes as CSV with tag names joined by `;`."""
+    writer = csv.writer(Echo())
+
+    def lines():
+        yield writer.writerow(CSV_FIELDS)
+        for row in recipe_rows(queryset):
+            row['tags'] = ';'.join(tag['name'] for tag in row['tags'])
+            yield writer.writerow([row[field] for field in CSV_FIELDS])
+
+    return _buffered(lines())
+
+
+FORMATS = {
+    'ndjson': (export_ndjson, 'application/x-ndjson'),
+    'csv': (export_csv, 'text/csv'),
+}
@@ -0,0 +1,60 @@
+"""
+Query parameter filters for the recipe list.
+"""
+from django.db.models import Count
+from rest_framework import serializers
+
+from core.models import Recipe
+
+
+class RecipeFilterSerializer(serializers.Serializer):
+    """Validate the recipe list filter query parameters."""
+    tags = serializers.CharField(required=False)
+    tags_match = serializers.ChoiceField(
+        choices=['any', 'all'], default='any'
+    )
+    price_min = serializers.DecimalField(
+        max_digits=5, decimal_places=2, required=False
+    )
+    price_max = serializers.DecimalField(
+        max_digits=5, decimal_places=2, required=False
+    )
+    time_max = serializers.IntegerField(min_value=0, required=False)
+
+    def validate_tags(self, value):
+        """Parse a comma separated list of tag ids."""
+        try:
+            return {int(pk) for pk in value.split(',') if pk.strip()}
+        except ValueError:
+            raise serializers.ValidationError(
+                'Expected a comma separated list of ids.'
+            )
+
+
+def filter_recipes(queryset, params):
+    """Apply the tag, price and time filters in params to recipes.
+
+    Tag filters go through the recipe/tag through table as a subquery so
+    no DISTINCT is needed; `tags_match=all` keeps recipes having every
+    given tag.
+    """
+    serializer = RecipeFilterSerializer(data=params)
+    serializer.is_valid(raise_exception=True)
+    filters = serializer.validated_data
+
+    tag_ids = filters.get('tags')
+    if tag_ids:
+        through = Recipe.tags.through.objects.filter(tag_id__in=tag_ids)
+        if filters['tags_match'] == 'all':
+            through = through.values('recipe_id').annotate(
+                matched=Count('tag_id')
+            ).filter(matched=len(tag_ids))
+        queryset = queryset.filter(id__in=through.values('recipe_id'))
+    if 'price_min' in filters:
+        queryset = queryset.filter(price__gte=filters['price_min'])
+    if 'price_max' in filters:
+        queryset = queryset.filter(price__lte=filters['price_max'])
+    if 'time_max' in filters:
+        queryset = queryset.filter(time_minutes__lte=filters['time_max'])
+
+    return queryset
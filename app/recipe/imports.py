@@ -0,0 +1,98 @@
+"""
+Streaming imports of recipes.
+"""
+import codecs
+import csv
+import json
+from itertools import islice
+
+from django.db import transaction
+from django.utils.translation import gettext as _
+from rest_framework import serializers
+
+from recipe.caching import bump_version_on_commit
+from recipe.serializers import RecipeDetailSerializer
+
+BATCH_SIZE = 1000
+
+
+def read_ndjson(lines):
+    """Yield (line number, row) for each line of NDJSON.
+
+    Rows that can't be parsed are yielded as None.
+    """
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield number, row if isinstance(row, dict) else None
+
+
+def read_csv(lines):
+    """Yield (line number, row) for each CSV record.
+
+    The `tags` column holds tag names separated by `;`.
+    """
+    reader = csv.DictReader(lines)
+    for row in reader:
+        tags = row.pop('tags', None) or ''
+        row['tags'] = [
+            {'name': name.strip()} for name in tags.split(';') if name.strip()
+        ]
+        yield reader.line_num, row
+
+
+READERS = {
+    'ndjson': read_ndjson,
+    'csv': read_csv,
+}
+
+
+def read_upload(upload, import_type):
+    """Yield rows from an uploaded or opened binary file.
+
+    The file must be UTF-8, with or without a BOM (Excel's "CSV UTF-8"
+    adds one); other bytes raise UnicodeDecodeError while reading.
+    """
+    return READERS[import_type](codecs.iterdecode(upload, 'utf-8-sig'))
+
+
+def import_recipes(user, rows, batch_size=BATCH_SIZE):
+    """Validate and insert rows in batches.
+
+    Yields (created, errors) for each batch, where errors is a list of
+    (line number, error detail) for the rows that were skipped.
+    """
+    child = RecipeDetailSerializer()
+    writer = RecipeDetailSerializer(many=True)
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+
+        valid = []
+        errors = []
+        for number, row in batch:
+            if row is None:
+                errors.append((number, {
+                    'non_field_errors': [_('Malformed row.')]
+                }))
+                continue
+            try:
+                attrs = child.run_validation(row)
+            except serializers.ValidationError as exc:
+                errors.append((number, exc.detail))
+            else:
+                attrs['user'] = user
+                valid.append(attrs)
+
+        with transaction.atomic():
+            created = writer.create(valid)
+            # bulk_create sends no signals to invalidate cached responses
+            if created:
+                bump_version_on_commit(user.pk)
+        yield len(created), errors
@@ -0,0 +1,75 @@
+"""
+Pagination classes for the recipe APIs.
+"""
+import math
+
+from django.conf import settings
+from django.core import signing
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, Cursor
+from rest_framework.utils.urls import replace_query_param
+
+
+class RecipeCursorPagination(CursorPagination):
+    """Keyset pagination over the recipe `-id` ordering.
+
+    Searches are paginated over their `-rank, -id` relevance order
+    instead. Pagination is opt-in: it is only applied when the client
+    sends a `cursor` or `page_size` query parameter, otherwise the full
+    list is returned as before. Cursors are signed so they can't be
+    tampered with.
+    """
+    ordering = '-id'
+    page_size = settings.RECIPE_PAGE_SIZE
+    max_page_size = settings.RECIPE_MAX_PAGE_SIZE
+    page_size_query_param = 'page_size'
+    cursor_salt = 'recipe.pagination.cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if (self.cursor_query_param not in params
+                and self.page_size_query_param not in params):
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_ordering(self, request, queryset, view):
+        if 'rank' in queryset.query.annotations:
+            return ('-rank', '-id')
+        return super().get_ordering(request, queryset, view)
+
+    def decode_cursor(self, request):
+        """Return the `Cursor` for a signed cursor query parameter."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            offset, reverse, position = signing.loads(
+                encoded, salt=self.cursor_salt
+            )
+            offset = int(offset)
+            if not 0 <= offset <= self.offset_cutoff:
+                raise ValueError
+            if position is not None:
+                if self.ordering[0] == '-rank':
+                    position = float(position)
+                    if not math.isfinite(position):
+                        raise ValueError
+                    position = str(position)
+                else:
+                    position = str(int(position))
+        except (signing.BadSignature, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return Cursor(offset=offset, reverse=bool(reverse), position=position)
+
+    def encode_cursor(self, cursor):
+        """Return the url for the given cursor with a signed token."""
+        encoded = signing.dumps(
+            [cursor.offset, int(cursor.reverse), cursor.position],
+            salt=self.cursor_salt,
+            compress=True,
+        )
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
@@ -0,0 +1,35 @@
+"""
+Full-text search for recipes.
+"""
+from django.conf import settings
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramWordSimilarity,
+)
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import Cast
+
+SEARCH_CONFIG = 'english'
+
+
+def search_recipes(queryset, text):
+    """Filter recipes matching text, best matches first.
+
+    Matches use the GIN indexed `search_vector`. With
+    RECIPE_SEARCH_TRIGRAM enabled, titles within a trigram distance of
+    the text match too, so small typos still find the recipe.
+    """
+    query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+    rank = SearchRank(F('search_vector'), query)
+    condition = Q(search_vector=query)
+    if settings.RECIPE_SEARCH_TRIGRAM:
+        rank = rank + TrigramWordSimilarity(text, 'title')
+        condition |= Q(title__trigram_word_similar=text)
+
+    # Ranks are real; as double precision they round trip exactly through
+    # pagination cursors.
+    rank = Cast(rank, FloatField())
+    return queryset.annotate(rank=rank).filter(condition).order_by(
+        '-rank', '-id'
+    )
@@ -2,19 +2,191 @@
 serializer for the recipe app.
 """
 
+from django.conf import settings
+from django.db import transaction
+from django.utils.translation import gettext as _
 from rest_framework import serializers
-from core.models import Recipe
+from core.models import Recipe, Tag
+from core.profiling import profiled
 
+BULK_BATCH_SIZE = 500
 
-class RecipeSerializer(serializers.ModelSerializer):
+
+def set_recipe_tags(user, recipe_tags, clear=True):
+    """Assign tags to recipes in bulk.
+
+    `recipe_tags` is a list of (recipe, tags) pairs where tags is a list
+    of tag dicts. Missing tags are created with one bulk insert and the
+    through rows are written with another, whatever the number of tags.
+    Existing tags of the recipes are replaced unless `clear` is False.
+    """
+    through = Recipe.tags.through
+    if clear:
+        through.objects.filter(
+            recipe_id__in=[recipe.id for recipe, _ in recipe_tags]
+        ).delete()
+
+    names = {tag['name'] for _, tags in recipe_tags for tag in tags}
+    if not names:
+        return
+
+    existing = {}
+    for tag in Tag.objects.filter(user=user, name__in=names).order_by('id'):
+        existing.setdefault(tag.name, tag)
+
+    missing = [Tag(user=user, name=name) for name in names
+               if name not in existing]
+    for tag in Tag.objects.bulk_create(missing):
+        existing[tag.name] = tag
+
+    through.objects.bulk_create([
+        through(recipe_id=recipe.id, tag_id=existing[name].id)
+        for recipe, tags in recipe_tags
+        for name in dict.fromkeys(tag['name'] for tag in tags)
+    ])
+
+
+class SparseFieldsMixin:
+    """Serializer taking a `fields` argument to only render those fields."""
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class TagSerializer(serializers.ModelSerializer):
+    """serializer for tags."""
+
+    class Meta:
+        model = Tag
+        fields = ["id", "name"]
+        read_only_fields = ["id"]
+
+    @profiled('serializer')
+    def to_representation(self, instance):
+        return super().to_representation(instance)
+
+
+class RecipeListSerializer(serializers.ListSerializer):
+    """List serializer writing recipes with bulk queries.
+
+    When updating, `instance` is a queryset of the recipes being changed
+    and each item of the data is matched to one of them by its `id`.
+    """
+
+    @profiled('serializer')
+    def to_representation(self, data):
+        return super().to_representation(data)
+
+    def to_internal_value(self, data):
+        self._matched = []
+        self._seen = set()
+        return super().to_internal_value(data)
+
+    def run_child_validation(self, data):
+        if self.instance is None:
+            return super().run_child_validation(data)
+
+        if not hasattr(self, '_instances'):
+            self._instances = {obj.id: obj for obj in self.instance}
+        try:
+            pk = int(data.get('id'))
+        except (AttributeError, TypeError, ValueError):
+            pk = None
+        if pk not in self._instances:
+            raise serializers.ValidationError(
+                {'id': [_('Recipe not found.')]}, code='not_found'
+            )
+        if pk in self._seen:
+            raise serializers.ValidationError(
+                {'id': [_('Duplicate recipe id.')]}, code='duplicate'
+            )
+        self._seen.add(pk)
+
+        self.child.instance = self._instances[pk]
+        self.child.initial_data = data
+        try:
+            attrs = super().run_child_validation(data)
+        finally:
+            self.child.instance = None
+        self._matched.append(self._instances[pk])
+        return attrs
+
+    def create(self, validated_data):
+        """create recipes with one bulk insert."""
+        tags = [attrs.pop('tags', []) for attrs in validated_data]
+        recipes = Recipe.objects.bulk_create(
+            [Recipe(**attrs) for attrs in validated_data],
+            batch_size=BULK_BATCH_SIZE,
+        )
+        if recipes:
+            set_recipe_tags(
+                recipes[0].user, list(zip(recipes, tags)), clear=False
+            )
+
+        return recipes
+
+    def update(self, instance, validated_data):
+        """update the matched recipes with one bulk update."""
+        recipes = self._matched
+        fields = set()
+        recipe_tags = []
+        for recipe, attrs in zip(recipes, validated_data):
+            tags = attrs.pop('tags', None)
+            if tags is not None:
+                recipe_tags.append((recipe, tags))
+            for attr, value in attrs.items():
+                setattr(recipe, attr, value)
+                fields.add(attr)
+
+        if fields:
+            Recipe.objects.bulk_update(
+                recipes, sorted(fields), batch_size=BULK_BATCH_SIZE
+            )
+        if recipe_tags:
+            set_recipe_tags(recipes[0].user, recipe_tags)
+
+        return recipes
+
+
+class RecipeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """serializer for recipes."""
+    tags = TagSerializer(many=True, required=False)
 
     class Meta:
         model = Recipe
         fields = [
-            "id", "title", "time_minutes", "price", "link"
+            "id", "title", "time_minutes", "price", "link", "tags"
         ]
         read_only_fields = ["id"]
+        list_serializer_class = RecipeListSerializer
+
+    @profiled('serializer')
+    def to_representation(self, instance):
+        return super().to_representation(instance)
+
+    def create(self, validated_data):
+        """create a recipe with its tags."""
+        tags = validated_data.pop('tags', [])
+        # One transaction, so cached responses are invalidated once the
+        # tags are written too. No savepoint: errors abort the request.
+        with transaction.atomic(savepoint=False):
+            recipe = Recipe.objects.create(**validated_data)
+            set_recipe_tags(recipe.user, [(recipe, tags)], clear=False)
+
+        return recipe
+
+    def update(self, instance, validated_data):
+        """update a recipe, replacing its tags if given."""
+        tags = validated_data.pop('tags', None)
+        with transaction.atomic(savepoint=False):
+            instance = super().update(instance, validated_data)
+            if tags is not None:
+                set_recipe_tags(instance.user, [(instance, tags)])
+
+        return instance
 
 
 class RecipeDetailSerializer(RecipeSerializer):
@@ -22,3 +194,22 @@ class RecipeDetailSerializer(RecipeSerializer):
 
     class Meta(RecipeSerializer.Meta):
         fields = RecipeSerializer.Meta.fields + ["description"]
+
+
+class RecipeBulkDeleteSerializer(serializers.Serializer):
+    """Serializer for the ids of recipes to delete in bulk."""
+    ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+    )
+
+    def validate(self, attrs):
+        """check the number of ids against RECIPE_BULK_MAX_ITEMS."""
+        max_length = settings.RECIPE_BULK_MAX_ITEMS
+        if len(attrs['ids']) > max_length:
+            msg = serializers.ListField.default_error_messages['max_length']
+            raise serializers.ValidationError(
+                {'ids': [msg.format(max_length=max_length)]},
+                code='max_length',
+            )
+        return attrs
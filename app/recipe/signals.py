@@ -0,0 +1,24 @@
+"""
+Signal handlers invalidating cached recipe responses.
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from core.models import Recipe, Tag
+from recipe.caching import bump_version_on_commit
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_user_responses(sender, instance, **kwargs):
+    """Bump the owner's version when a recipe or tag changes."""
+    bump_version_on_commit(instance.user_id)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def invalidate_on_tags_changed(sender, instance, action, **kwargs):
+    """Bump the owner's version when tags are added to a recipe."""
+    if action.startswith('post_'):
+        bump_version_on_commit(instance.user_id)
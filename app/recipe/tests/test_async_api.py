@@ -0,0 +1,180 @@
+"""
+Tests for the async recipe and user APIs.
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from core.models import Recipe, Tag
+from recipe.serializers import RecipeDetailSerializer, RecipeSerializer
+from user.authentication import token_cache
+
+
+ASYNC_RECIPE_URL = reverse('recipe:async-recipe-list')
+RECIPE_URL = reverse('recipe:recipe-list')
+ASYNC_ME_URL = reverse('user:async-me')
+
+
+def async_detail_url(recipe_id):
+    """return the async recipe detail url."""
+    return reverse('recipe:async-recipe-detail', args=[recipe_id])
+
+
+def create_recipe(user, **params):
+    """create and return a recipe."""
+    defaults = {
+        'title': 'test name',
+        'time_minutes': 22,
+        'price': Decimal('5.20'),
+        'description': 'Sample description',
+    }
+    defaults.update(params)
+    return Recipe.objects.create(user=user, **defaults)
+
+
+class PublicAsyncAPITests(TestCase):
+    """Test unauthenticated async requests."""
+
+    async def test_auth_required(self):
+        """test the async endpoints need a token."""
+        for url in (ASYNC_RECIPE_URL, ASYNC_ME_URL):
+            res = await self.async_client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+            self.assertEqual(res['WWW-Authenticate'], 'Token')
+
+    async def test_invalid_token(self):
+        """test an unknown token is rejected."""
+        res = await self.async_client.get(
+            ASYNC_RECIPE_URL, headers={'Authorization': 'Token nope'}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateAsyncAPITests(TestCase):
+    """Test authenticated async requests."""
+
+    def setUp(self):
+        token_cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com', password='test123', name='Test'
+        )
+        token = Token.objects.create(user=self.user)
+        self.headers = {'Authorization': f'Token {token.key}'}
+
+    async def test_list_recipes(self):
+        """test the async list matches the serializer output."""
+        recipe = await Recipe.objects.acreate(
+            user=self.user, title='Soup', time_minutes=5,
+            price=Decimal('1.00'),
+        )
+        tag = await Tag.objects.acreate(user=self.user, name='Hot')
+        await recipe.tags.aadd(tag)
+        other = await get_user_model().objects.acreate(email='o@example.com')
+        await Recipe.objects.acreate(
+            user=other, title='Other', time_minutes=5, price=Decimal('1.00')
+        )
+
+        res = await self.async_client.get(
+            ASYNC_RECIPE_URL, headers=self.headers
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        data = res.json()
+        self.assertEqual([r['id'] for r in data], [recipe.id])
+        self.assertEqual(data[0]['tags'], [{'id': tag.id, 'name': 'Hot'}])
+
+    def test_list_same_as_sync(self):
+        """test the async list renders like the sync endpoint."""
+        for _ in range(3):
+            create_recipe(user=self.user)
+
+        res = self.client.get(ASYNC_RECIPE_URL, headers=self.headers)
+
+        recipes = Recipe.objects.filter(user=self.user).order_by('-id')
+        expected = RecipeSerializer(recipes, many=True).data
+        self.assertEqual(res.json(), [dict(r) for r in expected])
+
+    def test_list_paginated(self):
+        """test the async list pages like the sync endpoint."""
+        recipes = [create_recipe(user=self.user) for _ in range(3)]
+
+        res = self.client.get(
+            ASYNC_RECIPE_URL, {'page_size': 2}, headers=self.headers
+        )
+        sync_res = self.client.get(
+            RECIPE_URL, {'page_size': 2}, headers=self.headers
+        )
+
+        data = res.json()
+        self.assertEqual([r['id'] for r in data['results']],
+                         [recipes[2].id, recipes[1].id])
+        self.assertEqual(data['results'], sync_res.json()['results'])
+        self.assertIsNotNone(data['next'])
+
+    def test_list_expand_description(self):
+        """test the async list takes `expand=description` too."""
+        create_recipe(user=self.user)
+
+        res = self.client.get(
+            ASYNC_RECIPE_URL, {'expand': 'description'}, headers=self.headers
+        )
+
+        recipes = Recipe.objects.filter(user=self.user)
+        expected = RecipeDetailSerializer(recipes, many=True).data
+        self.assertEqual(res.json(), [dict(r) for r in expected])
+
+    def test_list_invalid_filter(self):
+        """test invalid filters are reported as 400."""
+        res = self.client.get(
+            ASYNC_RECIPE_URL, {'time_max': 'x'}, headers=self.headers
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('time_max', res.json())
+
+    def test_retrieve_recipe(self):
+        """test retrieving a recipe and hiding other users' ones."""
+        recipe = create_recipe(user=self.user)
+        other = get_user_model().objects.create_user(email='o@example.com')
+        other_recipe = create_recipe(user=other)
+
+        res = self.client.get(async_detail_url(recipe.id),
+                              headers=self.headers)
+        missing = self.client.get(async_detail_url(other_recipe.id),
+                                  headers=self.headers)
+
+        self.assertEqual(res.json()['id'], recipe.id)
+        self.assertEqual(res.json()['description'], recipe.description)
+        self.assertEqual(missing.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_retrieve_and_update_me(self):
+        """test reading and updating the user asynchronously."""
+        res = self.client.get(ASYNC_ME_URL, headers=self.headers)
+        self.assertEqual(res.json(), {'email': self.user.email, 'name': 'Test'})
+
+        res = self.client.patch(
+            ASYNC_ME_URL,
+            {'name': 'New', 'password': 'newpass123'},
+            content_type='application/json',
+            headers=self.headers,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.name, 'New')
+        self.assertTrue(self.user.check_password('newpass123'))
+
+    def test_update_me_invalid(self):
+        """test validation errors are returned as 400."""
+        res = self.client.patch(
+            ASYNC_ME_URL, {'password': 'x'},
+            content_type='application/json', headers=self.headers,
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('password', res.json())
@@ -0,0 +1,140 @@
+"""
+Tests for the recipe response cache.
+"""
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tag
+from recipe import caching
+
+
+RECIPE_URL = reverse('recipe:recipe-list')
+
+
+def create_recipe(user, **params):
+    """create and return a recipe."""
+    defaults = {
+        'title': 'test name',
+        'time_minutes': 22,
+        'price': Decimal('5.20'),
+    }
+    defaults.update(params)
+    return Recipe.objects.create(user=user, **defaults)
+
+
+@override_settings(RECIPE_RESPONSE_CACHE={
+    'ENABLED': True, 'ALIAS': 'default', 'TIMEOUT': 300,
+})
+class RecipeResponseCacheTests(TestCase):
+    """Test list/detail responses are cached and invalidated."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com', password='test123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_repeated_list_served_from_cache(self):
+        """test an unchanged list is not queried again."""
+        create_recipe(user=self.user)
+        first = self.client.get(RECIPE_URL)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(RECIPE_URL)
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+        for header in ('Content-Type', 'Vary', 'Allow'):
+            self.assertEqual(second[header], first[header])
+
+    def test_if_none_match_returns_not_modified(self):
+        """test a matching ETag returns 304 without a body."""
+        create_recipe(user=self.user)
+        etag = self.client.get(RECIPE_URL)['ETag']
+
+        res = self.client.get(RECIPE_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res.content, b'')
+
+    def test_write_invalidates(self):
+        """test creating a recipe through the API changes the list."""
+        first = self.client.get(RECIPE_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                RECIPE_URL,
+                {'title': 'New', 'time_minutes': 5, 'price': '1.00'},
+            )
+        res = self.client.get(RECIPE_URL, HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.json()), 1)
+
+    def test_tag_change_invalidates(self):
+        """test renaming a tag changes cached recipe responses."""
+        recipe = create_recipe(user=self.user)
+        tag = Tag.objects.create(user=self.user, name='Old')
+        recipe.tags.add(tag)
+        url = reverse('recipe:recipe-detail', args=[recipe.id])
+        self.client.get(url)
+
+        tag.name = 'New'
+        with self.captureOnCommitCallbacks(execute=True):
+            tag.save()
+        res = self.client.get(url)
+
+        self.assertEqual(res.json()['tags'][0]['name'], 'New')
+
+    def test_invalidated_after_tags_written(self):
+        """test an update bumps the version once its tags are saved."""
+        recipe = create_recipe(user=self.user)
+        url = reverse('recipe:recipe-detail', args=[recipe.id])
+        tags_at_bump = []
+
+        def bump_version(user_id):
+            tags_at_bump.append(list(
+                recipe.tags.values_list('name', flat=True)
+            ))
+
+        with patch.object(caching, 'bump_version', bump_version), \
+                self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(
+                url, {'title': 'New', 'tags': [{'name': 'Vegan'}]},
+                format='json',
+            )
+
+        self.assertEqual(tags_at_bump, [['Vegan']])
+
+    def test_query_params_cached_separately(self):
+        """test different query params get different entries."""
+        create_recipe(user=self.user, title='Soup')
+        create_recipe(user=self.user, title='Salad')
+
+        self.client.get(RECIPE_URL)
+        res = self.client.get(RECIPE_URL, {'search': 'soup'})
+
+        self.assertEqual([r['title'] for r in res.json()], ['Soup'])
+
+    def test_users_do_not_share_entries(self):
+        """test one user's cached list isn't served to another."""
+        create_recipe(user=self.user)
+        self.client.get(RECIPE_URL)
+        other = get_user_model().objects.create_user(
+            email='other@example.com', password='test123'
+        )
+        self.client.force_authenticate(other)
+
+        res = self.client.get(RECIPE_URL)
+
+        self.assertEqual(res.json(), [])
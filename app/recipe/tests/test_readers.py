@@ -0,0 +1,142 @@
+"""
+Tests for the recipe read plans.
+"""
+import random
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db.models import Prefetch
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from core.models import Recipe, Tag
+from recipe.readers import ReadPlan, plan_for
+from recipe.serializers import (
+    RecipeDetailSerializer,
+    RecipeSerializer,
+    TagSerializer,
+)
+
+RECIPES_URL = reverse('recipe:recipe-list')
+TEXT = ['', 'a', 'Soup', 'crème brûlée', '"quoted"', 'line\nbreak',
+        ' ', '日本語', 'emoji 🍲', '\\slash', ' padded ']
+
+
+def random_text(rng):
+    """return a random string mixing awkward characters."""
+    return ''.join(rng.choice(TEXT) for _ in range(rng.randint(1, 4)))
+
+
+def create_random_recipes(rng, user, count):
+    """create count recipes with random values and tags for user."""
+    tags = [
+        Tag.objects.create(user=user, name=random_text(rng) or 'tag')
+        for _ in range(rng.randint(0, 5))
+    ]
+    for _ in range(count):
+        recipe = Recipe.objects.create(
+            user=user,
+            title=random_text(rng),
+            description=random_text(rng),
+            time_minutes=rng.choice([0, 1, rng.randint(2, 10**6), -5]),
+            price=rng.choice([
+                Decimal('0'), Decimal('0.1'), Decimal('999.99'),
+                Decimal(rng.randint(0, 99999)) / 100,
+            ]),
+            link=rng.choice([None, '', random_text(rng)]),
+        )
+        recipe.tags.set(rng.sample(tags, rng.randint(0, len(tags))))
+
+
+class ReadPlanTests(TestCase):
+    """Test read plans render like the serializers."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com', password='test123'
+        )
+        self.queryset = Recipe.objects.filter(user=self.user).order_by('-id')
+
+    def assertSameOutput(self, serializer_class):
+        """assert the plan and serializer render the same bytes."""
+        plan = plan_for(serializer_class)
+        expected = serializer_class(
+            self.queryset.prefetch_related(
+                Prefetch(
+                    'tags',
+                    queryset=Tag.objects.only('id', 'name').order_by('id'),
+                )
+            ),
+            many=True,
+        ).data
+
+        data = plan.serialize(plan.queryset(self.queryset))
+
+        renderer = JSONRenderer()
+        self.assertEqual(renderer.render(data), renderer.render(expected))
+
+    def test_random_recipes_render_identically(self):
+        """test random recipes render byte for byte like the serializer."""
+        for seed in range(20):
+            with self.subTest(seed=seed):
+                Recipe.objects.all().delete()
+                Tag.objects.all().delete()
+                create_random_recipes(random.Random(seed), self.user, 15)
+
+                self.assertSameOutput(RecipeDetailSerializer)
+                self.assertSameOutput(RecipeSerializer)
+
+    def test_serialize_queries(self):
+        """test a batch of rows takes two queries whatever its size."""
+        create_random_recipes(random.Random(0), self.user, 30)
+        plan = plan_for(RecipeDetailSerializer)
+
+        with self.assertNumQueries(2):
+            data = plan.serialize(plan.queryset(self.queryset))
+
+        self.assertEqual(len(data), 30)
+
+    def test_serialize_chunks(self):
+        """test chunked serialization matches serializing all at once."""
+        create_random_recipes(random.Random(1), self.user, 25)
+        plan = plan_for(RecipeDetailSerializer)
+
+        chunked = list(plan.serialize_chunks(self.queryset, 10))
+
+        self.assertEqual(
+            chunked, plan.serialize(plan.queryset(self.queryset))
+        )
+
+    def test_unsupported_nested_field(self):
+        """test nested serializers need a many-to-many field."""
+        class UserRecipeSerializer(serializers.ModelSerializer):
+            user = TagSerializer(many=True)
+
+            class Meta:
+                model = Recipe
+                fields = ['id', 'user']
+
+        with self.assertRaises(ValueError):
+            ReadPlan(UserRecipeSerializer)
+
+    def test_list_endpoint_output(self):
+        """test the list endpoint renders like the serializer."""
+        create_random_recipes(random.Random(2), self.user, 10)
+        client = APIClient()
+        client.force_authenticate(self.user)
+        expected = RecipeSerializer(self.queryset, many=True).data
+
+        for params in ({}, {'page_size': 4}):
+            res = client.get(RECIPES_URL, params)
+
+            results = res.json()
+            if params:
+                results = results['results']
+                expected = expected[:4]
+            self.assertEqual(
+                JSONRenderer().render(results),
+                JSONRenderer().render(expected),
+            )
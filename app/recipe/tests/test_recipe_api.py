@@ -1,14 +1,27 @@
+import csv
+import io
+import json
+from django.db import connection
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from decimal import Decimal
-from core.models import Recipe
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
+from core.models import Recipe, Tag
 from django.contrib.auth import get_user_model
 from rest_framework import status
 from rest_framework.test import APIClient
 from django.urls import reverse
-from recipe.serializers import RecipeDetailSerializer
+from recipe.serializers import RecipeDetailSerializer, RecipeSerializer
+from recipe.filters import filter_recipes
+from recipe.pagination import RecipeCursorPagination
 
 
 RECIPE_URL = reverse('recipe:recipe-list')
+RECIPE_BULK_URL = reverse('recipe:recipe-bulk')
+RECIPE_EXPORT_URL = reverse('recipe:recipe-export')
+RECIPE_IMPORT_URL = reverse('recipe:recipe-import-recipes')
 
 
 def recipe_detail_url(recipe_id):
@@ -64,7 +77,7 @@ class PrivateReipeAPITests(TestCase):
 
         res = self.client.get(RECIPE_URL)
         recipes = Recipe.objects.all().order_by('-id')
-        serializer = RecipeDetailSerializer(recipes, many=True)
+        serializer = RecipeSerializer(recipes, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data, serializer.data)
 
@@ -77,7 +90,7 @@ class PrivateReipeAPITests(TestCase):
         res = self.client.get(RECIPE_URL)
 
         recipes = Recipe.objects.filter(user=self.user)
-        serializer = RecipeDetailSerializer(recipes, many=True)
+        serializer = RecipeSerializer(recipes, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data, serializer.data)
 
@@ -189,3 +202,613 @@ class PrivateReipeAPITests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
         self.assertTrue(Recipe.objects.filter(id=recipe.id).exists())
+
+    def test_list_not_paginated_by_default(self):
+        """test list returns a plain list without pagination params."""
+        create_recipe(user=self.user)
+
+        res = self.client.get(RECIPE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(res.data, list)
+
+    def test_cursor_pagination(self):
+        """test walking the recipe list page by page."""
+        recipes = [create_recipe(user=self.user) for _ in range(5)]
+        expected = [r.id for r in reversed(recipes)]
+
+        res = self.client.get(RECIPE_URL, {'page_size': 2})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        seen = [r['id'] for r in res.data['results']]
+        self.assertIsNone(res.data['previous'])
+
+        while res.data['next']:
+            res = self.client.get(res.data['next'])
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            seen += [r['id'] for r in res.data['results']]
+
+        self.assertEqual(seen, expected)
+
+    def test_cursor_page_size_capped(self):
+        """test the page size can't go over the server maximum."""
+        for _ in range(3):
+            create_recipe(user=self.user)
+
+        with patch.object(RecipeCursorPagination, 'max_page_size', 2):
+            res = self.client.get(RECIPE_URL, {'page_size': 100})
+
+        self.assertEqual(len(res.data['results']), 2)
+        self.assertIsNotNone(res.data['next'])
+
+    def test_tampered_cursor_rejected(self):
+        """test a modified cursor returns 404."""
+        for _ in range(3):
+            create_recipe(user=self.user)
+        res = self.client.get(RECIPE_URL, {'page_size': 1})
+        cursor = parse_qs(urlparse(res.data['next']).query)['cursor'][0]
+
+        res = self.client.get(RECIPE_URL, {'cursor': cursor[:-2] + 'xx'})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_create_recipe_with_tags(self):
+        """test creating a recipe with new and existing tags."""
+        existing = Tag.objects.create(user=self.user, name='Indian')
+        payload = {
+            'title': 'Curry',
+            'time_minutes': 30,
+            'price': Decimal('2.50'),
+            'tags': [{'name': 'Indian'}, {'name': 'Dinner'}],
+        }
+
+        res = self.client.post(RECIPE_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        recipe = Recipe.objects.get(id=res.data['id'])
+        self.assertEqual(recipe.tags.count(), 2)
+        self.assertIn(existing, recipe.tags.all())
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 2)
+
+    def test_create_recipe_tags_query_count_constant(self):
+        """test creating tags doesn't run one query per tag."""
+        payload = {
+            'title': 'Salad',
+            'time_minutes': 5,
+            'price': Decimal('1.00'),
+        }
+        counts = []
+        for size in (1, 10):
+            payload['tags'] = [{'name': f'tag{i}'} for i in range(size)]
+            with CaptureQueriesContext(connection) as ctx:
+                res = self.client.post(RECIPE_URL, payload, format='json')
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+            counts.append(len(ctx))
+
+        self.assertEqual(counts[0], counts[1])
+
+    def test_update_recipe_tags(self):
+        """test updating replaces the recipe tags."""
+        recipe = create_recipe(user=self.user)
+        recipe.tags.add(Tag.objects.create(user=self.user, name='Lunch'))
+
+        payload = {'tags': [{'name': 'Breakfast'}]}
+        res = self.client.patch(
+            recipe_detail_url(recipe.id), payload, format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [tag['name'] for tag in res.data['tags']], ['Breakfast']
+        )
+        self.assertEqual(
+            list(recipe.tags.values_list('name', flat=True)), ['Breakfast']
+        )
+
+    def test_clear_recipe_tags(self):
+        """test an empty tag list removes all tags."""
+        recipe = create_recipe(user=self.user)
+        recipe.tags.add(Tag.objects.create(user=self.user, name='Lunch'))
+
+        res = self.client.patch(
+            recipe_detail_url(recipe.id), {'tags': []}, format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(recipe.tags.count(), 0)
+
+    def test_list_query_count_constant(self):
+        """test listing recipes with tags has no N+1 queries."""
+        counts = []
+        for size in (2, 20):
+            for i in range(size):
+                recipe = create_recipe(user=self.user)
+                recipe.tags.add(
+                    Tag.objects.create(user=self.user, name=f'tag{i}')
+                )
+            with CaptureQueriesContext(connection) as ctx:
+                res = self.client.get(RECIPE_URL)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertTrue(all(r['tags'] for r in res.data))
+            counts.append(len(ctx))
+
+        self.assertEqual(counts[0], counts[1])
+
+    def test_bulk_create_recipes(self):
+        """test creating many recipes in one request."""
+        payload = [
+            {
+                'title': f'Recipe {i}',
+                'time_minutes': i + 1,
+                'price': '1.50',
+                'tags': [{'name': 'Bulk'}],
+            }
+            for i in range(50)
+        ]
+
+        res = self.client.post(RECIPE_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data), 50)
+        self.assertEqual([r['title'] for r in res.data],
+                         [p['title'] for p in payload])
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 50)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 1)
+        self.assertTrue(all(r['tags'] for r in res.data))
+
+    def test_bulk_create_query_count_constant(self):
+        """test bulk create doesn't run a query per recipe."""
+        counts = []
+        for size in (2, 40):
+            payload = [
+                {'title': 'r', 'time_minutes': 1, 'price': '1.00',
+                 'tags': [{'name': f'tag{i}'}]}
+                for i in range(size)
+            ]
+            with CaptureQueriesContext(connection) as ctx:
+                res = self.client.post(RECIPE_BULK_URL, payload, format='json')
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+            counts.append(len(ctx))
+
+        self.assertEqual(counts[0], counts[1])
+
+    def test_bulk_create_reports_item_errors(self):
+        """test invalid items are reported and nothing is created."""
+        payload = [
+            {'title': 'ok', 'time_minutes': 1, 'price': '1.00'},
+            {'title': 'missing time', 'price': '1.00'},
+        ]
+
+        res = self.client.post(RECIPE_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertNotIn(0, res.data)
+        self.assertIn('time_minutes', res.data[1])
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_bulk_create_max_items(self):
+        """test the bulk endpoint rejects too many items."""
+        payload = [{'title': 'r', 'time_minutes': 1, 'price': '1.00'}] * 3
+
+        with self.settings(RECIPE_BULK_MAX_ITEMS=2):
+            res = self.client.post(RECIPE_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_bulk_update_recipes(self):
+        """test updating many recipes in one request."""
+        recipes = [create_recipe(user=self.user) for _ in range(3)]
+        payload = [
+            {'id': recipe.id, 'title': f'New {recipe.id}'}
+            for recipe in recipes
+        ]
+        payload[0]['tags'] = [{'name': 'Updated'}]
+
+        res = self.client.patch(RECIPE_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        for recipe in recipes:
+            recipe.refresh_from_db()
+            self.assertEqual(recipe.title, f'New {recipe.id}')
+            self.assertEqual(recipe.price, Decimal('5.20'))
+        self.assertEqual(res.data[0]['tags'][0]['name'], 'Updated')
+
+    def test_bulk_update_other_user_recipe(self):
+        """test bulk updating another user's recipe is an item error."""
+        other = create_user(email='other@example.com', password='test123')
+        mine = create_recipe(user=self.user)
+        theirs = create_recipe(user=other)
+        payload = [
+            {'id': mine.id, 'title': 'Mine'},
+            {'id': theirs.id, 'title': 'Stolen'},
+        ]
+
+        res = self.client.patch(RECIPE_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('id', res.data[1])
+        mine.refresh_from_db()
+        theirs.refresh_from_db()
+        self.assertNotEqual(mine.title, 'Mine')
+        self.assertNotEqual(theirs.title, 'Stolen')
+
+    def test_bulk_delete_recipes(self):
+        """test deleting many recipes in one request."""
+        recipes = [create_recipe(user=self.user) for _ in range(3)]
+        keep = create_recipe(user=self.user)
+
+        res = self.client.delete(
+            RECIPE_BULK_URL, {'ids': [r.id for r in recipes]}, format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(
+            list(Recipe.objects.values_list('id', flat=True)), [keep.id]
+        )
+
+    def test_bulk_delete_unknown_id(self):
+        """test deleting an unknown id deletes nothing."""
+        recipe = create_recipe(user=self.user)
+
+        res = self.client.delete(
+            RECIPE_BULK_URL, {'ids': [recipe.id, recipe.id + 100]},
+            format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(1, res.data['ids'])
+        self.assertTrue(Recipe.objects.filter(id=recipe.id).exists())
+
+    def test_bulk_delete_max_items(self):
+        """test the bulk delete rejects too many ids."""
+        recipes = [create_recipe(user=self.user) for _ in range(3)]
+
+        with self.settings(RECIPE_BULK_MAX_ITEMS=2):
+            res = self.client.delete(
+                RECIPE_BULK_URL, {'ids': [r.id for r in recipes]},
+                format='json'
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('ids', res.data)
+        self.assertEqual(Recipe.objects.count(), 3)
+
+    def test_export_ndjson(self):
+        """test exporting recipes as NDJSON."""
+        recipe = create_recipe(user=self.user)
+        recipe.tags.add(Tag.objects.create(user=self.user, name='Vegan'))
+        create_recipe(user=self.user, title='Second')
+
+        res = self.client.get(RECIPE_EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertEqual(res['Content-Type'], 'application/x-ndjson')
+        rows = [
+            json.loads(line)
+            for line in b''.join(res.streaming_content).splitlines()
+        ]
+        recipes = Recipe.objects.filter(user=self.user).order_by('-id')
+        serializer = RecipeDetailSerializer(recipes, many=True)
+        self.assertEqual(rows, json.loads(json.dumps(serializer.data)))
+
+    def test_export_csv(self):
+        """test exporting recipes as CSV."""
+        recipe = create_recipe(user=self.user, title='Soup, hot')
+        recipe.tags.add(Tag.objects.create(user=self.user, name='Vegan'))
+        recipe.tags.add(Tag.objects.create(user=self.user, name='Lunch'))
+        other = create_user(email='other@example.com', password='test123')
+        create_recipe(user=other)
+
+        res = self.client.get(RECIPE_EXPORT_URL, {'type': 'csv'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        content = b''.join(res.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['title'], 'Soup, hot')
+        self.assertEqual(rows[0]['price'], '5.20')
+        self.assertEqual(sorted(rows[0]['tags'].split(';')), ['Lunch', 'Vegan'])
+
+    def test_export_invalid_type(self):
+        """test an unknown export type is rejected."""
+        res = self.client.get(RECIPE_EXPORT_URL, {'type': 'xml'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_import_ndjson(self):
+        """test importing recipes from an NDJSON upload."""
+        lines = [
+            {'title': 'One', 'time_minutes': 5, 'price': '1.00',
+             'tags': [{'name': 'Quick'}]},
+            {'title': 'Missing price', 'time_minutes': 5},
+            {'title': 'Two', 'time_minutes': 10, 'price': 2.5,
+             'description': 'Tasty', 'tags': [{'name': 'Quick'}]},
+        ]
+        content = '\n'.join(json.dumps(line) for line in lines) + '\nnope\n'
+        upload = SimpleUploadedFile('recipes.ndjson', content.encode())
+
+        res = self.client.post(
+            RECIPE_IMPORT_URL, {'file': upload}, format='multipart'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['created'], 2)
+        self.assertEqual(res.data['error_count'], 2)
+        self.assertEqual([e['line'] for e in res.data['errors']], [2, 4])
+        self.assertIn('price', res.data['errors'][0]['errors'])
+        recipes = Recipe.objects.filter(user=self.user).order_by('id')
+        self.assertEqual([r.title for r in recipes], ['One', 'Two'])
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 1)
+
+    def test_import_csv_round_trip(self):
+        """test an exported CSV file imports back."""
+        recipe = create_recipe(user=self.user, title='Soup, hot')
+        recipe.tags.add(Tag.objects.create(user=self.user, name='Vegan'))
+        exported = b''.join(
+            self.client.get(RECIPE_EXPORT_URL, {'type': 'csv'}).streaming_content
+        )
+        other = create_user(email='other@example.com', password='test123')
+        self.client.force_authenticate(other)
+
+        res = self.client.post(
+            RECIPE_IMPORT_URL + '?type=csv',
+            {'file': SimpleUploadedFile('recipes.csv', exported)},
+            format='multipart',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['created'], 1)
+        imported = Recipe.objects.get(user=other)
+        self.assertEqual(imported.title, 'Soup, hot')
+        self.assertEqual(imported.price, Decimal('5.20'))
+        self.assertEqual(
+            list(imported.tags.values_list('name', flat=True)), ['Vegan']
+        )
+
+    def test_import_csv_with_bom(self):
+        """test a CSV saved as "CSV UTF-8" by Excel imports."""
+        content = '\ufefftitle,time_minutes,price\nSoup,10,3.50\n'
+
+        res = self.client.post(
+            RECIPE_IMPORT_URL + '?type=csv',
+            {'file': SimpleUploadedFile('recipes.csv', content.encode())},
+            format='multipart',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['created'], 1)
+
+    def test_import_not_utf8(self):
+        """test a file that isn't UTF-8 is rejected with a 400."""
+        content = 'title,time_minutes,price\nCrème,10,3.50\n'
+
+        res = self.client.post(
+            RECIPE_IMPORT_URL + '?type=csv',
+            {'file': SimpleUploadedFile('recipes.csv',
+                                        content.encode('latin-1'))},
+            format='multipart',
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('file', res.data)
+
+    def test_import_without_file(self):
+        """test importing without a file is rejected."""
+        res = self.client.post(RECIPE_IMPORT_URL, {}, format='multipart')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_search_recipes(self):
+        """test searching recipes by title and description."""
+        soup = create_recipe(user=self.user, title='Tomato soup',
+                             description='Warm and simple')
+        salad = create_recipe(user=self.user, title='Green salad',
+                              description='Goes well with tomatoes')
+        create_recipe(user=self.user, title='Pancakes', description='Sweet')
+        other = create_user(email='other@example.com', password='test123')
+        create_recipe(user=other, title='Tomato pie')
+
+        res = self.client.get(RECIPE_URL, {'search': 'tomato'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([r['id'] for r in res.data], [soup.id, salad.id])
+
+    def test_search_no_match(self):
+        """test a search without matches returns an empty list."""
+        create_recipe(user=self.user, title='Tomato soup')
+
+        res = self.client.get(RECIPE_URL, {'search': 'chocolate'})
+
+        self.assertEqual(res.data, [])
+
+    def test_search_paginated_by_rank(self):
+        """test paginated search keeps the relevance order."""
+        recipes = [
+            create_recipe(user=self.user, title=title, description=text)
+            for title, text in [
+                ('Tomato tomato soup', 'Tomato'),
+                ('Pasta', 'Goes well with tomatoes'),
+                ('Tomato salad', 'Fresh'),
+                ('Pizza', 'Tomato base, tomato sauce'),
+                ('Tomato', 'Tomato'),
+            ]
+        ]
+        expected = [
+            r['id'] for r in self.client.get(
+                RECIPE_URL, {'search': 'tomato'}
+            ).data
+        ]
+
+        ids = []
+        params = {'search': 'tomato', 'page_size': 2}
+        url = RECIPE_URL
+        while url:
+            res = self.client.get(url, params)
+            ids += [r['id'] for r in res.data['results']]
+            url, params = res.data['next'], None
+
+        self.assertEqual(ids, expected)
+        self.assertEqual(len(ids), len(recipes))
+        self.assertNotEqual(ids, sorted(ids, reverse=True))
+
+    def test_search_ignored_on_detail(self):
+        """test search only applies to the list."""
+        recipe = create_recipe(user=self.user, title='Pancakes')
+
+        res = self.client.get(
+            recipe_detail_url(recipe.id), {'search': 'tomato'}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_filter_by_tags(self):
+        """test filtering recipes having any or all of the tags."""
+        vegan = Tag.objects.create(user=self.user, name='Vegan')
+        quick = Tag.objects.create(user=self.user, name='Quick')
+        both = create_recipe(user=self.user)
+        both.tags.add(vegan, quick)
+        only_vegan = create_recipe(user=self.user)
+        only_vegan.tags.add(vegan)
+        create_recipe(user=self.user)
+
+        tags = f'{vegan.id},{quick.id}'
+        res_any = self.client.get(RECIPE_URL, {'tags': tags})
+        res_all = self.client.get(
+            RECIPE_URL, {'tags': tags, 'tags_match': 'all'}
+        )
+
+        self.assertEqual([r['id'] for r in res_any.data],
+                         [only_vegan.id, both.id])
+        self.assertEqual([r['id'] for r in res_all.data], [both.id])
+
+    def test_filter_by_price_and_time(self):
+        """test filtering recipes by price range and cooking time."""
+        cheap = create_recipe(user=self.user, price=Decimal('2.00'),
+                              time_minutes=10)
+        create_recipe(user=self.user, price=Decimal('2.00'), time_minutes=90)
+        create_recipe(user=self.user, price=Decimal('20.00'), time_minutes=10)
+
+        res = self.client.get(
+            RECIPE_URL, {'price_min': '1', 'price_max': '5', 'time_max': 30}
+        )
+
+        self.assertEqual([r['id'] for r in res.data], [cheap.id])
+
+    def test_filter_invalid_params(self):
+        """test invalid filter values are rejected."""
+        for params in ({'tags': 'a,b'}, {'price_min': 'x'},
+                       {'time_max': -1}, {'tags_match': 'some'}):
+            res = self.client.get(RECIPE_URL, params)
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_filter_plans_use_indexes(self):
+        """test each filter is answered from its index."""
+        tags = Tag.objects.bulk_create([
+            Tag(user=self.user, name=f'Tag {n}') for n in range(50)
+        ])
+        recipes = Recipe.objects.bulk_create([
+            Recipe(
+                user=self.user, title='Recipe', time_minutes=n % 500,
+                price=Decimal(n % 1000) / 10,
+            )
+            for n in range(5000)
+        ])
+        Recipe.tags.through.objects.bulk_create([
+            Recipe.tags.through(recipe=recipe, tag=tags[n % len(tags)])
+            for n, recipe in enumerate(recipes)
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE core_recipe, core_recipe_tags')
+        tag_index = 'core_recipe_tags_tag_id_'
+        expected = [
+            ({'price_min': '1', 'price_max': '1.5'}, 'recipe_user_price_idx'),
+            ({'time_max': '2'}, 'recipe_user_time_idx'),
+            ({'tags': str(tags[0].id)}, tag_index),
+            ({'tags': str(tags[0].id), 'tags_match': 'all'}, tag_index),
+        ]
+
+        for params, index in expected:
+            queryset = filter_recipes(
+                Recipe.objects.filter(user=self.user).order_by('-id'),
+                params,
+            )
+            plan = queryset.explain()
+            self.assertIn(index, plan, msg=f'{params}\n{plan}')
+
+    def test_list_sparse_fields(self):
+        """test `fields` limits the output and the columns read."""
+        recipe = create_recipe(user=self.user)
+        recipe.tags.add(Tag.objects.create(user=self.user, name='Vegan'))
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(RECIPE_URL, {'fields': 'title,id'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json(), [{'id': recipe.id, 'title': recipe.title}])
+        sql = ' '.join(query['sql'] for query in ctx.captured_queries)
+        self.assertNotIn('description', sql)
+        self.assertNotIn('core_tag', sql)
+
+    def test_list_sparse_fields_paginated(self):
+        """test `fields` works with cursor pagination without the id."""
+        recipes = [create_recipe(user=self.user) for _ in range(3)]
+
+        res = self.client.get(RECIPE_URL, {'fields': 'title', 'page_size': 2})
+        res = self.client.get(res.data['next'])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()['results'], [{'title': recipes[0].title}])
+
+    def test_retrieve_sparse_fields(self):
+        """test `fields` on the detail keeps the serializer's order."""
+        recipe = create_recipe(user=self.user)
+        recipe.tags.add(Tag.objects.create(user=self.user, name='Vegan'))
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(
+                recipe_detail_url(recipe.id), {'fields': 'tags,title'}
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(res.json()), ['title', 'tags'])
+        self.assertEqual(res.data['tags'][0]['name'], 'Vegan')
+        sql = ' '.join(query['sql'] for query in ctx.captured_queries)
+        self.assertNotIn('description', sql)
+
+    def test_unknown_sparse_fields(self):
+        """test fields the serializer doesn't have are rejected."""
+        recipe = create_recipe(user=self.user)
+
+        for url in (RECIPE_URL, recipe_detail_url(recipe.id)):
+            res = self.client.get(url, {'fields': 'title,user,secret'})
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(
+                res.data['fields'], ['Unknown fields: secret, user.']
+            )
+
+    def test_list_expand_description(self):
+        """test descriptions are only listed with `expand=description`."""
+        create_recipe(user=self.user)
+        recipes = Recipe.objects.filter(user=self.user)
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(RECIPE_URL)
+
+        self.assertNotIn('description', res.data[0])
+        sql = ' '.join(query['sql'] for query in ctx.captured_queries)
+        self.assertNotIn('description', sql)
+
+        res = self.client.get(RECIPE_URL, {'expand': 'description'})
+
+        self.assertEqual(
+            res.data, RecipeDetailSerializer(recipes, many=True).data
+        )
+
+    def test_list_unknown_expand(self):
+        """test unknown expansions are rejected."""
+        res = self.client.get(RECIPE_URL, {'expand': 'description,user'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data['expand'], ['Unknown expansions: user.'])
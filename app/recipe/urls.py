@@ -8,9 +8,20 @@ from recipe import views
 
 router = DefaultRouter()
 router.register('recipes', views.RetrieveViewSet)
+router.register('tags', views.TagViewSet)
 
 app_name = 'recipe'
 
 urlpatterns = [
     path('', include(router.urls)),
+    path(
+        'async/recipes/',
+        views.AsyncRecipeListView.as_view(),
+        name='async-recipe-list',
+    ),
+    path(
+        'async/recipes/<int:pk>/',
+        views.AsyncRecipeDetailView.as_view(),
+        name='async-recipe-detail',
+    ),
 ]
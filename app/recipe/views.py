@@ -2,29 +2,284 @@
 Views for the recipe apis.
 """
 
-from rest_framework import viewsets
-from rest_framework.authentication import TokenAuthentication
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
+from django.utils.translation import gettext as _
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import IsAuthenticated
-from core.models import Recipe
-from recipe import serializers
+from rest_framework.request import Request
+from rest_framework.response import Response
+from core.models import Recipe, Tag
+from core.views import AsyncTokenAPIView
+from user.authentication import CachedTokenAuthentication
+from recipe import exports, imports, serializers
+from recipe.caching import ResponseCacheMixin, bump_version
+from recipe.filters import filter_recipes
+from recipe.pagination import RecipeCursorPagination
+from recipe.readers import ReadPlanListMixin, plan_for
+from recipe.search import search_recipes
 
+IMPORT_MAX_ERRORS = 100
+LIST_EXPANSIONS = ('description',)
 
-class RetrieveViewSet(viewsets.ModelViewSet):
+
+def user_recipes(user, params, filtered=True):
+    """Return the user's recipes with tags, searched and filtered by params
+    unless `filtered` is False."""
+    queryset = Recipe.objects.filter(user=user).prefetch_related(
+        Prefetch(
+            'tags', queryset=Tag.objects.only('id', 'name').order_by('id')
+        )
+    )
+    if not filtered:
+        return queryset.order_by('-id')
+    queryset = filter_recipes(queryset, params)
+    search = params.get('search', '').strip()
+    if search:
+        return search_recipes(queryset, search)
+    return queryset.order_by('-id')
+
+
+def list_serializer_class(params):
+    """Return the compact list serializer, or the detail one when the
+    client asks for `?expand=description`."""
+    expand = {name.strip() for name in params.get('expand', '').split(',')}
+    unknown = expand.difference(LIST_EXPANSIONS, {''})
+    if unknown:
+        raise ValidationError({'expand': [
+            _('Unknown expansions: %s.') % ', '.join(sorted(unknown))
+        ]})
+    if 'description' in expand:
+        return serializers.RecipeDetailSerializer
+    return serializers.RecipeSerializer
+
+
+class RetrieveViewSet(ResponseCacheMixin,
+                      ReadPlanListMixin,
+                      viewsets.ModelViewSet):
     """view for manage recipe apis."""
     serializer_class = serializers.RecipeDetailSerializer
     queryset = Recipe.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = RecipeCursorPagination
 
     def get_queryset(self):
         """reterive recipes for authenticated user."""
-        return self.queryset.filter(user=self.request.user).order_by('-id')
+        queryset = user_recipes(
+            self.request.user,
+            self.request.query_params,
+            filtered=self.action in ('list', 'export'),
+        )
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            if 'tags' not in fields:
+                queryset = queryset.prefetch_related(None)
+            queryset = queryset.only(*self.get_read_plan().columns)
+        return queryset
 
     def get_serializer_class(self):
         if self.action == "list":
-            return serializers.RecipeDetailSerializer
+            return list_serializer_class(self.request.query_params)
         return self.serializer_class
 
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            kwargs['fields'] = fields
+        return super().get_serializer(*args, **kwargs)
+
+    def get_read_plan(self):
+        return plan_for(self.get_serializer_class(), self.get_sparse_fields())
+
+    def get_sparse_fields(self):
+        """return the fields picked with `?fields=`, in output order."""
+        param = self.request.query_params.get('fields', '')
+        if self.action not in ('list', 'retrieve') or not param.strip():
+            return None
+
+        requested = {name.strip() for name in param.split(',')} - {''}
+        allowed = plan_for(self.get_serializer_class()).names
+        unknown = requested.difference(allowed)
+        if unknown:
+            raise ValidationError({'fields': [
+                _('Unknown fields: %s.') % ', '.join(sorted(unknown))
+            ]})
+        return tuple(name for name in allowed if name in requested)
+
     def perform_create(self, serializer):
         """create a new recipe."""
         serializer.save(user=self.request.user)
+
+    @action(detail=False, methods=['post', 'patch', 'delete'], url_path='bulk')
+    def bulk(self, request):
+        """create, update or delete recipes in bulk."""
+        if request.method == 'DELETE':
+            return self.bulk_destroy(request)
+
+        instance = None
+        if request.method == 'PATCH':
+            ids = []
+            if isinstance(request.data, list):
+                ids = [item.get('id') for item in request.data
+                       if isinstance(item, dict)]
+            instance = self.get_queryset().filter(
+                id__in=[pk for pk in ids if str(pk).isdigit()]
+            )
+
+        serializer = self.get_serializer(
+            instance,
+            data=request.data,
+            many=True,
+            partial=instance is not None,
+            max_length=settings.RECIPE_BULK_MAX_ITEMS,
+        )
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            if instance is None:
+                recipes = serializer.save(user=request.user)
+            else:
+                recipes = serializer.save()
+        bump_version(request.user.pk)
+
+        ids = [recipe.id for recipe in recipes]
+        saved = self.get_queryset().in_bulk(ids)
+        data = self.get_serializer(
+            [saved[pk] for pk in ids], many=True
+        ).data
+        if instance is None:
+            return Response(data, status=status.HTTP_201_CREATED)
+        return Response(data)
+
+    def bulk_destroy(self, request):
+        """delete the recipes with the given ids."""
+        serializer = serializers.RecipeBulkDeleteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+
+        queryset = self.get_queryset().filter(id__in=ids)
+        found = set(queryset.values_list('id', flat=True))
+        missing = {
+            index: [_('Recipe not found.')]
+            for index, pk in enumerate(ids) if pk not in found
+        }
+        if missing:
+            raise ValidationError({'ids': missing})
+
+        with transaction.atomic():
+            queryset.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
+        """stream the user's recipes as NDJSON or CSV."""
+        export_type = request.query_params.get('type', 'ndjson')
+        if export_type not in exports.FORMATS:
+            raise ValidationError(
+                {'type': [_('Choose one of: %s.') % ', '.join(exports.FORMATS)]}
+            )
+
+        stream, content_type = exports.FORMATS[export_type]
+        response = StreamingHttpResponse(
+            stream(self.get_queryset()), content_type=content_type
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="recipes.{export_type}"'
+        )
+        return response
+
+    @action(detail=False, methods=['post'], url_path='import')
+    def import_recipes(self, request):
+        """import recipes from an uploaded NDJSON or CSV file."""
+        import_type = request.query_params.get('type', 'ndjson')
+        if import_type not in imports.READERS:
+            raise ValidationError(
+                {'type': [_('Choose one of: %s.') % ', '.join(imports.READERS)]}
+            )
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise ValidationError({'file': [_('No file was submitted.')]})
+
+        created = error_count = 0
+        errors = []
+        rows = imports.read_upload(upload, import_type)
+        try:
+            for batch_created, batch_errors in imports.import_recipes(
+                request.user, rows
+            ):
+                created += batch_created
+                error_count += len(batch_errors)
+                errors += [
+                    {'line': number, 'errors': detail}
+                    for number, detail in batch_errors
+                ][:IMPORT_MAX_ERRORS - len(errors)]
+        except UnicodeDecodeError:
+            raise ValidationError({'file': [
+                _('The file is not UTF-8 encoded, %d recipes were imported '
+                  'before the error.') % created
+            ]})
+
+        return Response(
+            {'created': created, 'error_count': error_count, 'errors': errors},
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+
+class TagViewSet(mixins.ListModelMixin,
+                 mixins.UpdateModelMixin,
+                 mixins.DestroyModelMixin,
+                 viewsets.GenericViewSet):
+    """view for manage tag apis."""
+    serializer_class = serializers.TagSerializer
+    queryset = Tag.objects.all()
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        """reterive tags for authenticated user."""
+        return self.queryset.filter(user=self.request.user).order_by('-name')
+
+
+class AsyncRecipeListView(AsyncTokenAPIView):
+    """async view listing the authenticated user's recipes."""
+
+    async def get(self, request):
+        serializer_class = list_serializer_class(request.GET)
+        queryset = user_recipes(request.user, request.GET)
+        if serializer_class is serializers.RecipeSerializer:
+            queryset = queryset.defer('description')
+        serializer = serializer_class()
+
+        # Paginated like the sync list; DRF pagination is sync.
+        paginator = RecipeCursorPagination()
+        page = await sync_to_async(paginator.paginate_queryset)(
+            queryset, Request(request)
+        )
+        if page is not None:
+            data = [serializer.to_representation(recipe) for recipe in page]
+            return self.render(paginator.get_paginated_response(data).data)
+
+        data = [
+            serializer.to_representation(recipe)
+            async for recipe in queryset.aiterator(
+                chunk_size=exports.CHUNK_SIZE
+            )
+        ]
+        return self.render(data)
+
+
+class AsyncRecipeDetailView(AsyncTokenAPIView):
+    """async view retrieving one of the user's recipes."""
+
+    async def get(self, request, pk):
+        queryset = user_recipes(request.user, request.GET, filtered=False)
+        try:
+            recipe = await queryset.aget(pk=pk)
+        except Recipe.DoesNotExist:
+            raise NotFound()
+        return self.render(serializers.RecipeDetailSerializer(recipe).data)
@@ -0,0 +1,214 @@
+"""
+Cached token authentication for the APIs.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.authentication import TokenAuthentication
+
+from core.profiling import profiled
+
+
+class TokenCache:
+    """LRU cache of token key -> (user, token) with a TTL.
+
+    Entries live in process memory first and optionally in a shared
+    Django cache (`SHARED_CACHE` alias) so other workers can reuse them.
+    Evictions only reach this process and the shared tier, so another
+    worker can keep serving a stale entry from its memory for up to `ttl`,
+    or `local_ttl` when there is a shared tier.
+    """
+    key_prefix = 'auth-token:'
+
+    def __init__(self, max_size, ttl, shared_cache=None, local_ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.local_ttl = ttl if local_ttl is None else local_ttl
+        self.shared_cache = shared_cache
+        self._entries = OrderedDict()
+        self._user_keys = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    @property
+    def shared(self):
+        """Return the shared cache backend or None."""
+        if self.shared_cache:
+            return caches[self.shared_cache]
+        return None
+
+    def get(self, key):
+        """Return the cached (user, token) for key or None."""
+        now = time.monotonic()
+        value = self._get_local(key, now)
+        if value is not None:
+            return value
+        if self.shared is not None:
+            value = self.shared.get(self.key_prefix + key)
+        return self._remember(key, value, now)
+
+    async def aget(self, key):
+        """Async `get`, reading the shared tier without blocking."""
+        now = time.monotonic()
+        value = self._get_local(key, now)
+        if value is not None:
+            return value
+        if self.shared is not None:
+            value = await self.shared.aget(self.key_prefix + key)
+        return self._remember(key, value, now)
+
+    def set(self, key, value):
+        """Cache the (user, token) pair for key."""
+        with self._lock:
+            self._store(key, value, time.monotonic())
+        if self.shared is not None:
+            self.shared.set(self.key_prefix + key, value, self.ttl)
+
+    async def aset(self, key, value):
+        """Async `set`, writing the shared tier without blocking."""
+        with self._lock:
+            self._store(key, value, time.monotonic())
+        if self.shared is not None:
+            await self.shared.aset(self.key_prefix + key, value, self.ttl)
+
+    def delete(self, *keys):
+        """Remove the given token keys from every tier."""
+        with self._lock:
+            for key in keys:
+                self._discard(key)
+        if self.shared is not None and keys:
+            self.shared.delete_many([self.key_prefix + key for key in keys])
+
+    def delete_user(self, user_id, keys=()):
+        """Remove every cached token of the user, and the given keys."""
+        keys = set(keys)
+        with self._lock:
+            keys |= self._user_keys.get(user_id, set())
+        self.delete(*keys)
+
+    def clear(self):
+        """Drop the in-process entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._user_keys.clear()
+            self.hits = self.shared_hits = self.misses = 0
+
+    def stats(self):
+        """Return the hit/miss counters and the hit ratio."""
+        with self._lock:
+            hits = self.hits + self.shared_hits
+            total = hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'shared_hits': self.shared_hits,
+                'misses': self.misses,
+                'hit_ratio': hits / total if total else 0.0,
+            }
+
+    def _get_local(self, key, now):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self._discard(key)
+        return None
+
+    def _remember(self, key, value, now):
+        """Count a shared tier lookup and keep its value in memory."""
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.shared_hits += 1
+            self._store(key, value, now)
+        return value
+
+    def _store(self, key, value, now):
+        self._discard(key)
+        ttl = self.ttl
+        if self.shared_cache:
+            ttl = min(ttl, self.local_ttl)
+        self._entries[key] = (now + ttl, value)
+        self._user_keys.setdefault(value[0].pk, set()).add(key)
+        while len(self._entries) > self.max_size:
+            self._discard(next(iter(self._entries)))
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        user_id = entry[1][0].pk
+        keys = self._user_keys.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._user_keys[user_id]
+
+
+token_cache = TokenCache(
+    max_size=settings.TOKEN_AUTH_CACHE['MAX_SIZE'],
+    ttl=settings.TOKEN_AUTH_CACHE['TTL'],
+    shared_cache=settings.TOKEN_AUTH_CACHE['SHARED_CACHE'],
+    local_ttl=settings.TOKEN_AUTH_CACHE['LOCAL_TTL'],
+)
+
+
+class TokenKeyAuthentication(TokenAuthentication):
+    """DRF's token header parsing, returning the key it found."""
+
+    def authenticate_credentials(self, key):
+        return key
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication that caches the token and user lookup."""
+    cache = token_cache
+
+    @profiled('auth')
+    def authenticate(self, request):
+        return super().authenticate(request)
+
+    def authenticate_credentials(self, key):
+        cached = self.cache.get(key)
+        if cached is None:
+            cached = super().authenticate_credentials(key)
+            self.cache.set(key, cached)
+
+        user, token = cached
+        # Hand out a copy so request code can't mutate the cached instance.
+        return copy.copy(user), token
+
+    @profiled('auth')
+    async def aauthenticate(self, request):
+        """Async counterpart of `authenticate` for async views.
+
+        Cache misses run DRF's token check in a thread.
+        """
+        key_reader = TokenKeyAuthentication()
+        key_reader.keyword = self.keyword
+        key = key_reader.authenticate(request)
+        if key is None:
+            return None
+
+        cached = await self.cache.aget(key)
+        if cached is None:
+            cached = await sync_to_async(
+                super().authenticate_credentials
+            )(key)
+            await self.cache.aset(key, cached)
+
+        user, token = cached
+        return copy.copy(user), token
@@ -0,0 +1,41 @@
+"""
+Authentication backends for the user apis.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import make_password
+
+from user.login import check_password_hash, run_hasher
+
+
+class PooledModelBackend(ModelBackend):
+    """ModelBackend checking passwords in the login hashing pool.
+
+    Hashes made with an outdated hasher are upgraded after a successful
+    login, like `User.check_password` does on the request thread.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        user_model = get_user_model()
+        if username is None:
+            username = kwargs.get(user_model.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+
+        try:
+            user = user_model._default_manager.get_by_natural_key(username)
+        except user_model.DoesNotExist:
+            # Hash anyway so unknown emails take as long as wrong passwords.
+            run_hasher(make_password, password)
+            return None
+
+        is_correct, new_hash = run_hasher(
+            check_password_hash, password, user.password
+        )
+        if not is_correct or not self.user_can_authenticate(user):
+            return None
+
+        if new_hash:
+            user.password = new_hash
+            user.save(update_fields=['password'])
+        return user
@@ -0,0 +1,151 @@
+"""
+Token login with throttling and password hashing off the request thread.
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+import django
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import make_password, verify_password
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.throttling import BaseThrottle
+
+_pool = None
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(settings.LOGIN_HASH_POOL['MAX_PENDING'])
+
+
+class HashingUnavailable(exceptions.APIException):
+    status_code = 503
+    default_detail = _('Login is temporarily unavailable, try again.')
+    default_code = 'service_unavailable'
+
+
+def _init_worker():
+    django.setup()
+
+
+def get_pool():
+    """Return the process pool running the password hashers."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.LOGIN_HASH_POOL['WORKERS'],
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+            )
+    return _pool
+
+
+def reset_pool(pool):
+    """Drop a broken pool so the next job starts a new one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def submit(func, *args):
+    """Submit func to the pool, replacing the pool once if it is broken.
+
+    Returns the pool and the future of the job.
+    """
+    pool = get_pool()
+    try:
+        return pool, pool.submit(func, *args)
+    except BrokenProcessPool:
+        reset_pool(pool)
+    pool = get_pool()
+    return pool, pool.submit(func, *args)
+
+
+def check_password_hash(password, encoded):
+    """Return (is_correct, new_hash), new_hash set if it must be upgraded."""
+    is_correct, must_update = verify_password(password, encoded)
+    if is_correct and must_update:
+        return True, make_password(password)
+    return is_correct, None
+
+
+def run_hasher(func, *args):
+    """Run func in the hashing pool, refusing work when it's saturated."""
+    if not _slots.acquire(blocking=False):
+        raise exceptions.Throttled(detail=_('Too many logins in progress.'))
+    if not settings.LOGIN_HASH_POOL['WORKERS']:
+        try:
+            return func(*args)
+        finally:
+            _slots.release()
+
+    try:
+        pool, future = submit(func, *args)
+    except BrokenProcessPool:
+        _slots.release()
+        raise HashingUnavailable()
+    except Exception:
+        _slots.release()
+        raise
+    # The slot is held until the job finishes, even after a timeout, so
+    # the pool queue never grows past MAX_PENDING.
+    future.add_done_callback(lambda _: _slots.release())
+    try:
+        return future.result(timeout=settings.LOGIN_HASH_POOL['TIMEOUT'])
+    except TimeoutError:
+        raise exceptions.Throttled(detail=_('Too many logins in progress.'))
+    except BrokenProcessPool:
+        # A worker died mid-job, e.g. killed for memory: the next login
+        # gets a new pool.
+        reset_pool(pool)
+        raise HashingUnavailable()
+
+
+def _failure_keys(email, ident):
+    return (f'login-fail:email:{email.lower()}', f'login-fail:ip:{ident}')
+
+
+def check_throttle(email, ident):
+    """Refuse the login when the email or ip had too many failures."""
+    conf = settings.LOGIN_THROTTLE
+    email_key, ip_key = _failure_keys(email, ident)
+    counts = caches['default'].get_many([email_key, ip_key])
+    if (counts.get(email_key, 0) >= conf['FAILURES']
+            or counts.get(ip_key, 0) >= conf['IP_FAILURES']):
+        raise exceptions.Throttled(wait=conf['WINDOW'])
+
+
+def record_failure(email, ident):
+    """Count a failed login for the email and the ip."""
+    cache = caches['default']
+    for key in _failure_keys(email, ident):
+        if not cache.add(key, 1, settings.LOGIN_THROTTLE['WINDOW']):
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, 1, settings.LOGIN_THROTTLE['WINDOW'])
+
+
+def verify_login(request, email, password):
+    """Return the active user matching the credentials or None.
+
+    Failures are throttled per email and per ip before any hashing is
+    done. The credentials are checked by `authenticate()`, so the
+    configured backends run and `user_login_failed` is sent on failure;
+    `user.backends.PooledModelBackend` hashes in a bounded process pool.
+    """
+    ident = BaseThrottle().get_ident(request)
+    check_throttle(email, ident)
+
+    user = authenticate(request, email=email, password=password)
+    if user is None:
+        record_failure(email, ident)
+        return None
+
+    caches['default'].delete(_failure_keys(email, ident)[0])
+    return user
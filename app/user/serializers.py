@@ -2,13 +2,11 @@
 Serializer s for the api view.
 """
 
-from django.contrib.auth import (
-    get_user_model,
-    authenticate,
-)
+from django.contrib.auth import get_user_model
 from django.utils.translation import gettext as _
 from core.models import User
 from rest_framework import serializers
+from user.login import verify_login
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -31,15 +29,19 @@ class UserSerializer(serializers.ModelSerializer):
         return get_user_model().objects.create_user(**validated_data)
 
     def update(self, instance, validated_data):
-        """updated and return user."""
+        """updated and return user with a single write."""
         password = validated_data.pop('password', None)
-        user = super().update(instance, validated_data)
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        update_fields = list(validated_data)
 
         if password:
-            user.set_password(password)
-            user.save()
+            instance.set_password(password)
+            update_fields.append('password')
+        if update_fields:
+            instance.save(update_fields=update_fields)
 
-        return user
+        return instance
 
 
 class AuthenticationToken(serializers.Serializer):
@@ -56,11 +58,7 @@ class AuthenticationToken(serializers.Serializer):
         """validate and authenticate the user."""
         email = attrs.get('email')
         password = attrs.get('password')
-        user = authenticate(
-            request=self.context.get('request'),
-            username=email,
-            password=password
-        )
+        user = verify_login(self.context.get('request'), email, password)
         if not user:
             msg = _("Unable to authenticate provided credentials.")
             raise serializers.ValidationError(msg, code='authenticate')
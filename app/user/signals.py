@@ -0,0 +1,31 @@
+"""
+Signal handlers keeping the token auth cache in sync.
+"""
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from user.authentication import token_cache
+
+
+@receiver(post_delete, sender=Token)
+def evict_deleted_token(sender, instance, **kwargs):
+    """Drop a deleted token from the cache."""
+    token_cache.delete(instance.key)
+
+
+@receiver(post_save, sender=get_user_model())
+def evict_user_tokens(sender, instance, created, **kwargs):
+    """Drop cached tokens on every save, the cached user is served as
+    `request.user` and must not go stale."""
+    if created:
+        return
+
+    keys = ()
+    if token_cache.shared is not None:
+        # Evaluated here: delete_user holds the cache lock while reading it.
+        keys = list(Token.objects.filter(
+            user_id=instance.pk
+        ).values_list('key', flat=True))
+    token_cache.delete_user(instance.pk, keys)
@@ -0,0 +1,170 @@
+"""
+Tests for the cached token authentication.
+"""
+from unittest.mock import AsyncMock, Mock, PropertyMock, patch
+
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from user.authentication import TokenCache, token_cache
+
+
+ME = reverse('user:me')
+ASYNC_ME = reverse('user:async-me')
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Test token lookups are cached and invalidated."""
+
+    def setUp(self):
+        token_cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='razim123',
+            name='Test Name',
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def tearDown(self):
+        token_cache.clear()
+
+    def test_second_request_skips_token_query(self):
+        """test the token lookup only hits the database once."""
+        self.client.get(ME)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['email'], self.user.email)
+        stats = token_cache.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hit_ratio'], 0.5)
+
+    def test_deleted_token_evicted(self):
+        """test deleting a token revokes access immediately."""
+        self.client.get(ME)
+
+        self.token.delete()
+        res = self.client.get(ME)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_evicted(self):
+        """test deactivating a user revokes access immediately."""
+        self.client.get(ME)
+
+        self.user.is_active = False
+        self.user.save(update_fields=['is_active'])
+        res = self.client.get(ME)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_change_evicts(self):
+        """test changing the password drops the cached entry."""
+        self.client.get(ME)
+
+        self.user.set_password('newpass123')
+        self.user.save()
+
+        self.assertEqual(token_cache.stats()['size'], 0)
+
+    def test_patch_then_get_is_fresh(self):
+        """test a PATCH to me is seen by the next cached GET."""
+        self.client.get(ME)
+
+        self.client.patch(ME, {'name': 'Other', 'email': 'new@example.com'})
+        res = self.client.get(ME)
+
+        self.assertEqual(res.data['name'], 'Other')
+        self.assertEqual(res.data['email'], 'new@example.com')
+
+    def test_delete_user_reads_keys_unlocked(self):
+        """test the given keys aren't read while holding the cache lock."""
+        def keys():
+            self.assertFalse(token_cache._lock.locked())
+            yield self.token.key
+
+        self.client.get(ME)
+        token_cache.delete_user(self.user.pk, keys())
+
+        self.assertEqual(token_cache.stats()['size'], 0)
+
+    def test_cache_is_bounded(self):
+        """test old entries are evicted past the max size."""
+        other = get_user_model().objects.create_user(
+            email='other@example.com', password='razim123'
+        )
+        other_token = Token.objects.create(user=other)
+        max_size, token_cache.max_size = token_cache.max_size, 1
+        try:
+            self.client.get(ME)
+            self.client.credentials(
+                HTTP_AUTHORIZATION=f'Token {other_token.key}'
+            )
+            self.client.get(ME)
+        finally:
+            token_cache.max_size = max_size
+
+        self.assertIsNone(token_cache.get(self.token.key))
+        self.assertIsNotNone(token_cache.get(other_token.key))
+
+    def test_shared_tier_used_after_local_miss(self):
+        """test another worker can reuse the shared cache entry."""
+        token_cache.shared_cache = 'default'
+        try:
+            self.client.get(ME)
+            token_cache.clear()
+
+            with self.assertNumQueries(0):
+                res = self.client.get(ME)
+        finally:
+            token_cache.shared.clear()
+            token_cache.shared_cache = None
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(token_cache.stats()['shared_hits'], 1)
+
+    def test_local_entries_expire_with_shared_tier(self):
+        """test an eviction by another worker applies after LOCAL_TTL."""
+        token_cache.shared_cache = 'default'
+        local_ttl, token_cache.local_ttl = token_cache.local_ttl, 0
+        try:
+            self.client.get(ME)
+            # Another worker deactivates the user: its signal only evicts
+            # the shared tier, not this process.
+            get_user_model().objects.filter(pk=self.user.pk).update(
+                is_active=False
+            )
+            token_cache.shared.delete(token_cache.key_prefix + self.token.key)
+
+            res = self.client.get(ME)
+        finally:
+            token_cache.shared.clear()
+            token_cache.shared_cache = None
+            token_cache.local_ttl = local_ttl
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_async_shared_tier_does_not_block(self):
+        """test async requests use the shared tier's async methods."""
+        shared = Mock(aget=AsyncMock(return_value=None), aset=AsyncMock())
+        with patch.object(TokenCache, 'shared', new_callable=PropertyMock,
+                          return_value=shared), \
+                patch.object(token_cache, 'shared_cache', 'shared'):
+            res = await self.async_client.get(
+                ASYNC_ME, headers={'Authorization': f'Token {self.token.key}'}
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        shared.aget.assert_awaited_once()
+        shared.aset.assert_awaited_once()
+        shared.get.assert_not_called()
+        shared.set.assert_not_called()
@@ -0,0 +1,200 @@
+"""
+Tests for the throttled token login.
+"""
+import os
+import signal
+import threading
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_login_failed
+from django.contrib.auth.hashers import (
+    get_hasher,
+    identify_hasher,
+    make_password,
+)
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user import login
+
+
+TOKEN_URL = reverse('user:token')
+
+
+class TokenLoginThrottleTests(TestCase):
+    """Test failed logins are throttled before hashing."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com', password='razim123'
+        )
+        self.client = APIClient()
+
+    def tearDown(self):
+        cache.clear()
+
+    def login(self, password, email='test@example.com', **extra):
+        """post credentials to the token endpoint."""
+        return self.client.post(
+            TOKEN_URL, {'email': email, 'password': password}, **extra
+        )
+
+    def test_failures_throttled_per_email(self):
+        """test too many failures block the email, even the right password."""
+        with self.settings(LOGIN_THROTTLE={
+            'FAILURES': 2, 'IP_FAILURES': 100, 'WINDOW': 60
+        }):
+            for _ in range(2):
+                res = self.login('wrong')
+                self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+            with patch('user.login.run_hasher') as run_hasher:
+                res = self.login('razim123')
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(res['Retry-After'], '60')
+        run_hasher.assert_not_called()
+
+    def test_failures_throttled_per_ip(self):
+        """test failures for different emails add up for one ip."""
+        with self.settings(LOGIN_THROTTLE={
+            'FAILURES': 100, 'IP_FAILURES': 2, 'WINDOW': 60
+        }):
+            self.login('wrong', email='a@example.com')
+            self.login('wrong', email='b@example.com')
+            blocked = self.login('razim123')
+            other_ip = self.login('razim123', REMOTE_ADDR='10.0.0.2')
+
+        self.assertEqual(blocked.status_code,
+                         status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(other_ip.status_code, status.HTTP_200_OK)
+
+    def test_forwarded_for_ignored(self):
+        """test a spoofed X-Forwarded-For doesn't dodge the ip throttle."""
+        with self.settings(LOGIN_THROTTLE={
+            'FAILURES': 100, 'IP_FAILURES': 2, 'WINDOW': 60
+        }):
+            for ip in ('10.0.0.3', '10.0.0.4'):
+                self.login('wrong', email=f'{ip}@example.com',
+                           HTTP_X_FORWARDED_FOR=ip)
+            res = self.login('razim123', HTTP_X_FORWARDED_FOR='10.0.0.5')
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_failure_sends_login_failed_signal(self):
+        """test a failed login goes through authenticate() and is signalled."""
+        failed = []
+
+        def receiver(sender, credentials, request, **kwargs):
+            failed.append(credentials['email'])
+
+        user_login_failed.connect(receiver)
+        self.addCleanup(user_login_failed.disconnect, receiver)
+        self.login('wrong')
+
+        self.assertEqual(failed, ['test@example.com'])
+
+    def test_success_resets_email_failures(self):
+        """test a successful login clears the email failure count."""
+        with self.settings(LOGIN_THROTTLE={
+            'FAILURES': 2, 'IP_FAILURES': 100, 'WINDOW': 60
+        }):
+            self.login('wrong')
+            self.assertEqual(self.login('razim123').status_code,
+                             status.HTTP_200_OK)
+            res = self.login('wrong')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_saturated_pool_returns_429(self):
+        """test logins are refused when the hashing queue is full."""
+        with patch('user.login._slots', threading.BoundedSemaphore(1)) as slots:
+            slots.acquire()
+            res = self.login('razim123')
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_inactive_user_rejected(self):
+        """test an inactive user can't get a token."""
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.login('razim123')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertNotIn('token', res.data)
+
+
+class PasswordHasherUpgradeTests(TestCase):
+    """Test hashes are upgraded to the default hasher on login."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_new_passwords_use_default_hasher(self):
+        """test new users get a hash from the configured hasher."""
+        user = get_user_model().objects.create_user(
+            email='test@example.com', password='razim123'
+        )
+
+        self.assertEqual(identify_hasher(user.password).algorithm,
+                         get_hasher().algorithm)
+
+    def test_old_hash_rehashed_on_login(self):
+        """test a PBKDF2 hash is replaced after a successful login."""
+        user = get_user_model().objects.create_user(email='test@example.com')
+        user.password = make_password('razim123', hasher='pbkdf2_sha256')
+        user.save()
+
+        res = self.client.post(
+            TOKEN_URL, {'email': user.email, 'password': 'razim123'}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        user.refresh_from_db()
+        self.assertEqual(identify_hasher(user.password).algorithm,
+                         get_hasher().algorithm)
+        self.assertTrue(user.check_password('razim123'))
+
+    def test_failed_login_keeps_old_hash(self):
+        """test a wrong password doesn't touch the stored hash."""
+        user = get_user_model().objects.create_user(email='test@example.com')
+        user.password = make_password('razim123', hasher='pbkdf2_sha256')
+        user.save()
+        old_hash = user.password
+
+        self.client.post(TOKEN_URL, {'email': user.email, 'password': 'no'})
+
+        user.refresh_from_db()
+        self.assertEqual(user.password, old_hash)
+
+
+class HashingPoolTests(SimpleTestCase):
+    """Test the hashing pool recovers from dead workers."""
+
+    def setUp(self):
+        patcher = patch('user.login._pool', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(lambda: login._pool and login.reset_pool(login._pool))
+
+    def test_killed_worker_replaced(self):
+        """test a killed worker breaks at most one login, not all later."""
+        pid = login.run_hasher(os.getpid)
+        os.kill(pid, signal.SIGKILL)
+
+        pids = []
+        for _ in range(2):
+            try:
+                pids.append(login.run_hasher(os.getpid))
+            except login.HashingUnavailable:
+                pass
+
+        self.assertTrue(pids)
+        self.assertNotIn(pid, pids)
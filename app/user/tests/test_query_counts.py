@@ -0,0 +1,152 @@
+"""
+Tests locking in the number of queries and writes of the user API.
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from user.authentication import token_cache
+
+
+CREATE_USER_URL = reverse('user:create')
+TOKEN_URL = reverse('user:token')
+ME = reverse('user:me')
+
+WRITES = ('INSERT', 'UPDATE', 'DELETE')
+
+
+def writes(ctx):
+    """return the write statements captured by ctx."""
+    return [
+        query['sql'] for query in ctx.captured_queries
+        if query['sql'].lstrip().upper().startswith(WRITES)
+    ]
+
+
+class UserQueryCountTests(TestCase):
+    """Test each user API path issues the expected queries."""
+
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+        self.client = APIClient()
+
+    def create_user(self, **params):
+        """create and return a user."""
+        defaults = {'email': 'test@example.com', 'password': 'razim123'}
+        defaults.update(params)
+        return get_user_model().objects.create_user(**defaults)
+
+    def test_create_user_single_insert(self):
+        """test creating a user checks the email and inserts once."""
+        payload = {'email': 'new@example.com', 'password': 'razim123',
+                   'name': 'New'}
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.post(CREATE_USER_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(ctx), 2)
+        self.assertEqual(len(writes(ctx)), 1)
+
+    def test_create_user_manager_single_insert(self):
+        """test create_user writes once."""
+        with CaptureQueriesContext(connection) as ctx:
+            self.create_user()
+
+        self.assertEqual(len(writes(ctx)), 1)
+
+    def test_create_superuser_single_insert(self):
+        """test create_superuser writes once."""
+        with CaptureQueriesContext(connection) as ctx:
+            user = get_user_model().objects.create_superuser(
+                'admin@example.com', 'razim123'
+            )
+
+        self.assertEqual(len(writes(ctx)), 1)
+        user.refresh_from_db()
+        self.assertTrue(user.is_superuser)
+        self.assertTrue(user.is_staff)
+
+    def test_token_queries(self):
+        """test a login reads the user and the token only."""
+        user = self.create_user()
+        Token.objects.create(user=user)
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.post(
+                TOKEN_URL, {'email': user.email, 'password': 'razim123'}
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(ctx), 2)
+        self.assertEqual(writes(ctx), [])
+
+    def test_first_token_single_insert(self):
+        """test the first login creates the token with one insert."""
+        user = self.create_user()
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post(
+                TOKEN_URL, {'email': user.email, 'password': 'razim123'}
+            )
+
+        self.assertEqual(len(writes(ctx)), 1)
+
+    def test_retrieve_me_no_queries(self):
+        """test reading the profile needs no queries once authenticated."""
+        user = self.create_user()
+        self.client.force_authenticate(user)
+
+        with self.assertNumQueries(0):
+            self.client.get(ME)
+
+    def test_update_name_single_update(self):
+        """test updating the name writes only the name column."""
+        user = self.create_user()
+        self.client.force_authenticate(user)
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.patch(ME, {'name': 'New'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(ctx), 1)
+        [sql] = writes(ctx)
+        self.assertIn('"name"', sql)
+        self.assertNotIn('"password"', sql)
+        self.assertNotIn('"email"', sql)
+
+    def test_update_password_and_name_single_update(self):
+        """test updating the password and name is one write."""
+        user = self.create_user()
+        self.client.force_authenticate(user)
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.patch(
+                ME, {'name': 'New', 'password': 'newpass123'}
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        [sql] = writes(ctx)
+        self.assertIn('"password"', sql)
+        self.assertIn('"name"', sql)
+        user.refresh_from_db()
+        self.assertTrue(user.check_password('newpass123'))
+
+    def test_update_email_checks_uniqueness_and_writes_once(self):
+        """test changing the email runs the unique check and one write."""
+        user = self.create_user()
+        self.client.force_authenticate(user)
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.patch(ME, {'email': 'changed@example.com'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(ctx), 2)
+        self.assertEqual(len(writes(ctx)), 1)
@@ -10,4 +10,5 @@ urlpatterns = [
     path('create/', views.CreateUserView.as_view(), name='create'),
     path('token/', views.CreateTokenView.as_view(), name="token"),
     path('me/', views.ManageUserView.as_view(), name="me"),
+    path('async/me/', views.AsyncManageUserView.as_view(), name="async-me"),
 ]
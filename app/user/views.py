@@ -1,10 +1,13 @@
 """
 Views for the user API.
 """
-from rest_framework import generics, permissions, authentication
+from asgiref.sync import sync_to_async
+from rest_framework import generics, permissions
 from user.serializers import UserSerializer, AuthenticationToken
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.settings import api_settings
+from user.authentication import CachedTokenAuthentication
+from core.views import AsyncTokenAPIView
 
 
 class CreateUserView(generics.CreateAPIView):
@@ -23,8 +26,31 @@ class ManageUserView(generics.RetrieveUpdateAPIView):
     """manage authicated user."""
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = UserSerializer
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
 
     def get_object(self):
         """retreive and retur the authticated user."""
         return self.request.user
+
+
+class AsyncManageUserView(AsyncTokenAPIView):
+    """async view to manage the authenticated user."""
+
+    async def get(self, request):
+        return self.render(UserSerializer(request.user).data)
+
+    async def patch(self, request):
+        return await self.update(request, partial=True)
+
+    async def put(self, request):
+        return await self.update(request, partial=False)
+
+    async def update(self, request, partial):
+        """validate and save the user."""
+        serializer = UserSerializer(
+            request.user, data=self.parse(request), partial=partial
+        )
+        # Validation checks email uniqueness and saving writes, both sync.
+        await sync_to_async(serializer.is_valid)(raise_exception=True)
+        await sync_to_async(serializer.save)()
+        return self.render(serializer.data)